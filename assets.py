@@ -0,0 +1,259 @@
+import io
+import json
+import struct
+import sys
+import time
+import zlib
+
+import pygame
+
+IS_WEB = sys.platform == "emscripten"
+if not IS_WEB:
+    from concurrent.futures import ThreadPoolExecutor
+
+
+class LazyCache(dict):
+    """dict that builds missing entries with factory(key) on first access."""
+
+    def __init__(self, factory, size=None):
+        super().__init__()
+        self.factory = factory
+        self.size = size
+
+    def __missing__(self, key):
+        value = self[key] = self.factory(key)
+        return value
+
+    def __len__(self):
+        return self.size if self.size is not None else dict.__len__(self)
+
+# ==========================================
+# 1. IMAGE JOBS
+# ==========================================
+def decode_image(path, size=None, smooth=False, width=None, process=None):
+    """Load and scale an image without touching the display (safe off the main thread)."""
+    img = pygame.image.load(path)
+    if process:
+        img = process(img)
+    if width:
+        w, h = img.get_size()
+        size = (width, int(width * (h / w)))
+    if size:
+        if smooth:
+            img = pygame.transform.smoothscale(img, size)
+        else:
+            img = pygame.transform.scale(img, size)
+    return img
+
+def circle_photo(size, zoom=1.0):
+    """Build a process() hook that crops to a centered square, scales and masks to a circle."""
+    def process(img):
+        if not img.get_flags() & pygame.SRCALPHA:
+            rgba = pygame.Surface(img.get_size(), pygame.SRCALPHA)
+            rgba.blit(img, (0, 0))
+            img = rgba
+        orig_w, orig_h = img.get_size()
+        crop_size = int(min(orig_w, orig_h) * zoom)
+        if zoom != 1.0:
+            crop_x = (orig_w - crop_size) // 2
+            crop_y = (orig_h - crop_size) // 2
+            zoom_surf = pygame.Surface((crop_size, crop_size), pygame.SRCALPHA)
+            zoom_surf.blit(img, (0, 0), (crop_x, crop_y, crop_size, crop_size))
+            img = zoom_surf
+        img = pygame.transform.smoothscale(img, (size, size))
+        mask = pygame.Surface((size, size), pygame.SRCALPHA)
+        pygame.draw.circle(mask, (255, 255, 255), (size // 2, size // 2), size // 2)
+        img.blit(mask, (0, 0), special_flags=pygame.BLEND_RGBA_MIN)
+        return img
+    return process
+
+def image_specs(screen_width, tile_size):
+    """Every image the game shows, with the on-screen size it is drawn at."""
+    vw = int(350 * 0.65)
+    specs = {
+        "disco_ball": dict(path="assets/images/disco_ball.png", size=(225, 225)),
+        "neon_sign": dict(path="assets/images/neon_sign.png", size=(200, 100)),
+        "mystery_machine": dict(path="assets/images/mystery_machine.png", size=(300, 200)),
+        "crowd": dict(path="assets/images/crowd.png", size=(screen_width, 300)),
+        "charli": dict(path="assets/images/charli.png", size=(300, 390)),
+        "scooby": dict(path="assets/images/scooby.png", size=(150, 180)),
+        "booth": dict(path="assets/images/booth.png", size=(350, 250)),
+        "addison": dict(path="assets/images/addison.png", size=(150, 200)),
+        "paparazzi": dict(path="assets/images/paparazzi.png", size=(350, 150)),
+        "homer": dict(path="assets/images/homer.png", size=(127, 153)),
+        "pink": dict(path="assets/images/pink.png", width=130, smooth=True),
+        "paparazzi_2": dict(path="assets/images/paparazzi_2.png", size=(350, int(350 * (768 / 1344))), smooth=True),
+        "vip_photo": dict(path="assets/images/anneliese_photo.png", size=(vw, int(vw * (1280 / 1775))), smooth=True),
+    }
+    for i in range(1, 5):
+        specs[f"anneliese_{i}"] = dict(path=f"assets/images/anneliese_{i}.png",
+                                       process=circle_photo(tile_size - 14, zoom=0.6 if i == 3 else 1.0))
+    return specs
+
+# ==========================================
+# 2. PRE-BAKED ASSET BUNDLE
+# ==========================================
+BUNDLE_MAGIC = b"ABNDL1\0\0"
+
+class Bundle:
+    """Read side of the packed asset bundle written by bundle.py.
+
+    Layout: magic, u32 header length, JSON header, then the payload. Images
+    are zlib-compressed RGBA pixels already at their final size; sounds are
+    the raw encoded file for one platform. The whole file is read in one go
+    (memory-mapped on desktop) and entries are sliced out of it.
+    """
+
+    def __init__(self, data, header):
+        self.data = data
+        self.header = header
+        self.base = len(BUNDLE_MAGIC) + 4 + header.pop("_header_len")
+
+    @classmethod
+    def open(cls, path):
+        """Open a bundle, or return None if there isn't a usable one at path."""
+        try:
+            with open(path, "rb") as f:
+                if IS_WEB:
+                    data = f.read()
+                else:
+                    import mmap
+                    data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):  # mmap of an empty file raises ValueError
+            return None
+        magic_end = len(BUNDLE_MAGIC)
+        if data[:magic_end] != BUNDLE_MAGIC:
+            print(f"[ASSETS] ignoring {path}: not an asset bundle")
+            return None
+        try:
+            (header_len,) = struct.unpack("<I", data[magic_end:magic_end + 4])
+            header = json.loads(bytes(data[magic_end + 4:magic_end + 4 + header_len]))
+        except (struct.error, ValueError) as e:
+            print(f"[ASSETS] ignoring {path}: damaged header ({e})")
+            return None
+        header["_header_len"] = header_len
+        return cls(data, header)
+
+    def _slice(self, entry):
+        start = self.base + entry["offset"]
+        return self.data[start:start + entry["length"]]
+
+    def has_image(self, name, size=None, width=None):
+        """True if the bundle holds `name` at the size the spec asks for."""
+        entry = self.header["images"].get(name)
+        if entry is None:
+            return False
+        stored = tuple(entry["size"])
+        if (size and stored != tuple(size)) or (width and stored[0] != width):
+            print(f"[ASSETS] bundled {name} is {stored[0]}x{stored[1]}, out of date with its spec")
+            return False
+        return True
+
+    def image(self, name):
+        entry = self.header["images"][name]
+        pixels = zlib.decompress(self._slice(entry))
+        return pygame.image.frombytes(pixels, tuple(entry["size"]), "RGBA")
+
+    def sound(self, name):
+        """File-like object for a bundled sound, or None."""
+        entry = self.header["sounds"].get(name)
+        return io.BytesIO(self._slice(entry)) if entry else None
+
+# ==========================================
+# 3. ASSET MANAGER
+# ==========================================
+class AssetManager:
+    """Decodes images on a thread pool and finishes them on the main thread.
+
+    Queue work with image(), then call poll() once per frame: it hands
+    finished surfaces to convert_alpha() and reports progress. In the
+    browser build there are no threads, so poll() decodes one image per
+    call instead and the loading screen still animates between images.
+    Per-asset timings (decode and convert, in ms) are kept in `timings`.
+    """
+
+    def __init__(self, bundle=None, workers=4):
+        self.bundle = bundle
+        self.pool = None if IS_WEB else ThreadPoolExecutor(max_workers=workers)
+        self.jobs = {}
+        self.pending = []
+        self.images = {}
+        self.timings = {}
+        self.started = time.perf_counter()
+
+    def image(self, name, path, size=None, smooth=False, width=None, process=None):
+        """Queue an image; taken pre-scaled from the bundle when it has one."""
+        if self.bundle and self.bundle.has_image(name, size, width):
+            args = (self.bundle.image, name)
+        else:
+            args = (decode_image, path, size, smooth, width, process)
+        self.pending.append(name)
+        self.jobs[name] = self.pool.submit(self._decode, *args) if self.pool else args
+
+    @staticmethod
+    def _decode(loader, *args):
+        start = time.perf_counter()
+        try:
+            img = loader(*args)
+        except Exception as e:
+            print(f"[ASSETS] failed to load {args[0]}: {e}")
+            img = None
+        return img, (time.perf_counter() - start) * 1000
+
+    def _finish(self, name, result):
+        img, decode_ms = result
+        start = time.perf_counter()
+        if img is not None:
+            img = img.convert_alpha()
+        self.images[name] = img
+        self.timings[name] = (decode_ms, (time.perf_counter() - start) * 1000)
+
+    def poll(self):
+        """Finish whatever is ready; returns progress in [0, 1]."""
+        if not self.pool:
+            if self.pending:
+                name = self.pending.pop(0)
+                self._finish(name, self._decode(*self.jobs[name]))
+            return self.progress
+        still_pending = []
+        for name in self.pending:
+            job = self.jobs[name]
+            if job.done():
+                self._finish(name, job.result())
+            else:
+                still_pending.append(name)
+        self.pending = still_pending
+        if not self.pending:
+            self.pool.shutdown(wait=False)
+            self.pool = None
+        return self.progress
+
+    def wait(self):
+        """Block until every queued image is finished (for tools with no loading screen)."""
+        while not self.done:
+            self.poll()
+            if self.pool:
+                time.sleep(0.001)
+        return self.images
+
+    @property
+    def progress(self):
+        return 1.0 if not self.jobs else len(self.images) / len(self.jobs)
+
+    @property
+    def done(self):
+        return not self.pending
+
+    def get(self, name):
+        return self.images.get(name)
+
+    def sound(self, name, path):
+        """Bundled copy of a sound if there is one, else the path to load from."""
+        bundled = self.bundle.sound(name) if self.bundle else None
+        return bundled if bundled is not None else path
+
+    def report(self):
+        total = (time.perf_counter() - self.started) * 1000
+        slowest = sorted(self.timings.items(), key=lambda kv: -(kv[1][0] + kv[1][1]))[:5]
+        print(f"[ASSETS] {len(self.images)} images in {total:.0f} ms; slowest: " +
+              ", ".join(f"{name} {d:.0f}+{c:.0f} ms" for name, (d, c) in slowest))
@@ -0,0 +1,166 @@
+import json
+import random
+import sys
+import threading
+
+import pygame
+
+IS_WEB = sys.platform == "emscripten"
+if IS_WEB:
+    import platform as _platform
+
+MUSIC_PATH = "assets/sounds/background_track.mp3"
+MUSIC_VOLUME = 0.3
+
+# name -> (file stem, volume, voices)
+SOUNDS = {
+    "match_1": ("party_girl_1", 0.8, 3),
+    "match_2": ("party_girl_2", 0.8, 3),
+    "party_girl_5": ("party_girl_5", 1.0, 2),
+}
+
+# Loaded once on the first click. Each sound gets a pool of preloaded Audio
+# elements that play() cycles through, so overlapping matches don't cut
+# each other off; play() takes a comma-separated batch of names.
+JS_SHIM = """
+window._audio = (function (sounds) {
+    const pools = {}, next = {};
+    for (const [name, url, volume, voices] of sounds) {
+        pools[name] = [];
+        next[name] = 0;
+        for (let i = 0; i < voices; i++) {
+            const a = new Audio(url);
+            a.preload = "auto";
+            a.volume = volume;
+            pools[name].push(a);
+        }
+    }
+    return {
+        play(names) {
+            for (const name of names.split(",")) {
+                const pool = pools[name];
+                if (!pool) continue;
+                const a = pool[next[name]];
+                next[name] = (next[name] + 1) % pool.length;
+                a.currentTime = 0;
+                a.play().catch(() => {});
+            }
+        },
+        music(url, volume) {
+            const a = new Audio(url);
+            a.loop = true;
+            a.volume = volume;
+            a.play().catch(() => {});
+        },
+    };
+})(%s);
+"""
+
+
+# ==========================================
+# 1. AUDIO MANAGER
+# ==========================================
+class AudioManager:
+    """Sound effects on fixed voice pools, played in one batch per frame.
+
+    play() only queues a name; flush() is called once per frame and starts
+    everything queued since the last one (each sound at most once per
+    frame). On desktop every sound owns a few reserved mixer channels and
+    steals its own oldest voice when they are all busy. In the browser a
+    JS shim is evaluated once in start() and flush() makes one call into
+    it. Desktop effects are decoded and the background track started on a
+    worker thread (in the browser the track is a streaming Audio element),
+    so the first frame after the click isn't held up by either; effects
+    queued before their voices exist are dropped.
+    """
+
+    def __init__(self, assets=None):
+        self.assets = assets
+        self.queue = []
+        self.sounds = {}
+        self.pools = {}
+        self.next_voice = {}
+        self.web = None
+        self.started = False
+        self.rng = random.Random()
+
+    def start(self):
+        """Create every voice; must run from a user gesture in the browser."""
+        if self.started:
+            return
+        self.started = True
+        if IS_WEB:
+            self._start_web()
+        else:
+            self._start_desktop()
+
+    def _start_web(self):
+        sounds = [[name, f"assets/sounds/{stem}.ogg", volume, voices]
+                  for name, (stem, volume, voices) in SOUNDS.items()]
+        try:
+            _platform.window.eval(JS_SHIM % json.dumps(sounds))
+            self.web = _platform.window._audio
+            self.web.music(MUSIC_PATH, MUSIC_VOLUME)
+        except Exception as e:
+            print(f"[AUDIO] JS audio init failed: {e}")
+            self.web = None
+
+    def _start_desktop(self):
+        try:
+            total = sum(voices for _, _, voices in SOUNDS.values())
+            pygame.mixer.set_num_channels(max(8, total + 2))
+            pygame.mixer.set_reserved(total)
+        except Exception as e:
+            print(f"[AUDIO] mixer unavailable: {e}")
+            return
+        threading.Thread(target=self._load_desktop, daemon=True).start()
+
+    def _load_desktop(self):
+        """Decode the effects, then start the music; runs on a worker thread."""
+        channel = 0
+        for name, (stem, volume, voices) in SOUNDS.items():
+            path = f"assets/sounds/{stem}.mp3"
+            try:
+                sound = pygame.mixer.Sound(self.assets.sound(stem, path) if self.assets else path)
+                sound.set_volume(volume)
+            except Exception as e:
+                print(f"[AUDIO] failed to load {stem}: {e}")
+                channel += voices
+                continue
+            self.sounds[name] = sound
+            self.next_voice[name] = 0
+            self.pools[name] = [pygame.mixer.Channel(channel + i) for i in range(voices)]
+            channel += voices
+        try:
+            pygame.mixer.music.load(MUSIC_PATH)
+            pygame.mixer.music.set_volume(MUSIC_VOLUME)
+            pygame.mixer.music.play(-1)
+        except Exception as e:
+            print(f"[AUDIO] background track failed: {e}")
+
+    def play(self, name):
+        if self.started:
+            self.queue.append(name)
+
+    def play_match(self, count):
+        self.play("party_girl_5" if count >= 5 else self.rng.choice(("match_1", "match_2")))
+
+    def flush(self):
+        """Start everything queued this frame."""
+        if not self.queue:
+            return
+        names = list(dict.fromkeys(self.queue))
+        self.queue.clear()
+        if self.web is not None:
+            try:
+                self.web.play(",".join(names))
+            except Exception:
+                pass
+            return
+        for name in names:
+            pool = self.pools.get(name)
+            if not pool:
+                continue
+            i = self.next_voice[name]
+            self.next_voice[name] = (i + 1) % len(pool)
+            pool[i].play(self.sounds[name])
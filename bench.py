@@ -0,0 +1,202 @@
+import os
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import argparse
+import fnmatch
+import json
+import platform
+import random
+import sys
+import time
+
+import pygame
+
+from assets import AssetManager, Bundle, image_specs
+from board import Board
+from main import (BUNDLE_PATH, BRAT_GREEN, SCREEN_HEIGHT, SCREEN_WIDTH, TILE_SIZE, Game,
+                  apply_gravity, find_matches, is_board_stable, make_tiles)
+from quality import TIERS, tier_index
+from render import Compositor
+
+BOARD_SIZES = [8, 16, 32, 64, 128]
+COLOR_COUNTS = [3, 4, 6]
+RENDER_SEEDS = [1, 2, 3]
+
+
+# ==========================================
+# 1. TIMING HELPERS
+# ==========================================
+def ops_per_second(fn, setup=None, min_time=0.2):
+    """Run fn (after setup, which is not timed) until min_time has elapsed."""
+    total_ns, runs = 0, 0
+    while total_ns < min_time * 1e9:
+        arg = setup() if setup else None
+        start = time.perf_counter_ns()
+        fn(arg)
+        total_ns += time.perf_counter_ns() - start
+        runs += 1
+    return runs / (total_ns / 1e9)
+
+def percentile(sorted_values, p):
+    return sorted_values[min(len(sorted_values) - 1, (len(sorted_values) - 1) * p // 100)]
+
+# ==========================================
+# 2. BOARD LOGIC
+# ==========================================
+def bench_board(sizes, colors, min_time):
+    results = {}
+    for size in sizes:
+        for n_colors in colors:
+            rng = random.Random(size * 100 + n_colors)
+            board = Board(size, num_colors=n_colors, rng=rng)
+            board.randomize()
+            tag = f"{size}x{size}/{n_colors}c"
+
+            def fresh_board(_=None):
+                b = board.copy()
+                b.mark_all()
+                return b
+
+            results[f"find_matches.full/{tag}"] = ops_per_second(lambda b: find_matches(b), fresh_board, min_time)
+
+            def swapped_board(_=None):
+                b = board.copy()
+                b.dirty_rows.clear()
+                b.dirty_cols.clear()
+                r, c = rng.randrange(size), rng.randrange(size - 1)
+                b.swap(r, c, r, c + 1)
+                return b
+
+            results[f"find_matches.swap/{tag}"] = ops_per_second(lambda b: find_matches(b), swapped_board, min_time)
+
+            def cleared(_=None):
+                b = board.copy()
+                grid = make_tiles(b)
+                holes = b.find_all_matches() or [(rng.randrange(size), rng.randrange(size)) for _ in range(size)]
+                b.clear(holes)
+                for r, c in holes:
+                    grid[r][c] = None
+                return b, grid
+
+            results[f"apply_gravity/{tag}"] = ops_per_second(lambda bg: apply_gravity(*bg), cleared, min_time)
+
+        grid = make_tiles(Board(size))
+        results[f"is_board_stable/{size}x{size}"] = ops_per_second(lambda _: is_board_stable(grid), None, min_time)
+    return {name: {"value": value, "unit": "ops/s", "higher_is_better": True} for name, value in results.items()}
+
+# ==========================================
+# 3. FULL-FRAME RENDER
+# ==========================================
+def load_images():
+    assets = AssetManager(Bundle.open(BUNDLE_PATH))
+    for name, spec in image_specs(SCREEN_WIDTH, TILE_SIZE).items():
+        assets.image(name, **spec)
+    return assets.wait()
+
+def bench_render(seeds, frames, quality=0):
+    screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
+    images = load_images()
+    results = {}
+    for seed in seeds:
+        game = Game(images, rng=random.Random(seed), quality=TIERS[quality])
+        comp = Compositor(screen, BRAT_GREEN)
+        samples = []
+        partial = 0
+        for _ in range(frames):
+            start = time.perf_counter_ns()
+            game.update()
+            game.draw(comp)
+            pushed = comp.present()
+            samples.append((time.perf_counter_ns() - start) / 1e6)
+            partial += pushed != [comp.screen_rect]
+        samples.sort()
+        for p in (50, 95, 99):
+            results[f"frame.p{p}/seed{seed}"] = {"value": percentile(samples, p), "unit": "ms",
+                                                 "higher_is_better": False}
+        results[f"frame.partial/seed{seed}"] = {"value": 100 * partial / max(1, frames), "unit": "%",
+                                                "higher_is_better": True}
+    return results
+
+# ==========================================
+# 4. REGRESSION CHECK
+# ==========================================
+def compare(results, baseline, tolerance, overrides):
+    """Return the names whose result is worse than baseline by more than their threshold."""
+    regressions = []
+    for name, res in results.items():
+        base = baseline.get(name)
+        if not base or not base["value"]:
+            continue
+        limit = tolerance
+        for pattern, value in overrides:
+            if fnmatch.fnmatch(name, pattern):
+                limit = value
+        change = res["value"] / base["value"] - 1
+        worse = -change if res["higher_is_better"] else change
+        res["change"] = change
+        if worse > limit:
+            regressions.append((name, base["value"], res["value"], worse, limit))
+    return regressions
+
+def parse_threshold(text):
+    pattern, _, value = text.partition("=")
+    return pattern, float(value)
+
+def parse_quality(text):
+    try:
+        return tier_index(text)
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(str(e))
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Headless board and render benchmarks")
+    parser.add_argument("--out", default="bench.json")
+    parser.add_argument("--baseline", help="earlier bench JSON to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.15,
+                        help="allowed slowdown as a fraction (default 0.15)")
+    parser.add_argument("--threshold", type=parse_threshold, action="append", default=[],
+                        metavar="PATTERN=FRACTION", help="per-benchmark tolerance, glob on the name")
+    parser.add_argument("--frames", type=int, default=300)
+    parser.add_argument("--min-time", type=float, default=0.2, help="seconds per board benchmark")
+    parser.add_argument("--sizes", type=int, nargs="+", default=BOARD_SIZES)
+    parser.add_argument("--colors", type=int, nargs="+", default=COLOR_COUNTS)
+    parser.add_argument("--quality", type=parse_quality, default=0, help="render quality tier (name or index)")
+    parser.add_argument("--skip-render", action="store_true")
+    args = parser.parse_args(argv)
+
+    pygame.init()
+    results = bench_board(args.sizes, args.colors, args.min_time)
+    if not args.skip_render:
+        results.update(bench_render(RENDER_SEEDS, args.frames, args.quality))
+
+    regressions = []
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(results, json.load(f)["results"], args.tolerance, args.threshold)
+
+    report = {
+        "meta": {
+            "python": platform.python_version(),
+            "pygame": pygame.version.ver,
+            "machine": platform.machine(),
+            "video_driver": pygame.display.get_driver(),
+            "quality": TIERS[args.quality].name,
+            "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        },
+        "results": results,
+    }
+    with open(args.out, "w") as f:
+        json.dump(report, f, indent=2)
+
+    for name, res in results.items():
+        change = f"  ({res['change']:+.1%})" if "change" in res else ""
+        print(f"{name:<36} {res['value']:>12.2f} {res['unit']}{change}")
+    for name, base, value, worse, limit in regressions:
+        print(f"[BENCH] REGRESSION {name}: {base:.2f} -> {value:.2f} ({worse:.1%} worse, limit {limit:.0%})")
+    pygame.quit()
+    return 1 if regressions else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
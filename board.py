@@ -0,0 +1,381 @@
+import random
+
+EMPTY = 255
+
+
+# ==========================================
+# 1. ARRAY-BACKED BOARD
+# ==========================================
+class Board:
+    """Match-3 board stored as a flat bytearray of color ids (row-major)."""
+
+    __slots__ = ("rows", "cols", "num_colors", "cells", "rng", "dirty_rows", "dirty_cols",
+                 "touched")
+
+    def __init__(self, rows, cols=None, num_colors=4, rng=None):
+        self.rows = rows
+        self.cols = cols if cols is not None else rows
+        self.num_colors = num_colors
+        self.cells = bytearray(self.rows * self.cols)
+        self.rng = rng if rng is not None else random
+        self.dirty_rows = set()
+        self.dirty_cols = set()
+        self.touched = set()
+        self.mark_all()
+
+    @classmethod
+    def from_rows(cls, rows, num_colors=4, rng=None):
+        board = cls(len(rows), len(rows[0]), num_colors, rng)
+        for r, row in enumerate(rows):
+            for c, color_id in enumerate(row):
+                board.cells[r * board.cols + c] = EMPTY if color_id is None else color_id
+        board.mark_all()
+        return board
+
+    def to_rows(self):
+        cols = self.cols
+        return [[None if v == EMPTY else v for v in self.cells[r * cols:(r + 1) * cols]]
+                for r in range(self.rows)]
+
+    def copy(self, rng=None):
+        """Independent copy (cells and dirty state), optionally drawing refills from another rng."""
+        board = Board.__new__(Board)
+        board.rows, board.cols, board.num_colors = self.rows, self.cols, self.num_colors
+        board.cells = bytearray(self.cells)
+        board.rng = rng if rng is not None else self.rng
+        board.dirty_rows = set(self.dirty_rows)
+        board.dirty_cols = set(self.dirty_cols)
+        board.touched = set(self.touched)
+        return board
+
+    def get(self, r, c):
+        return self.cells[r * self.cols + c]
+
+    def set(self, r, c, color_id):
+        self.cells[r * self.cols + c] = color_id
+        self.dirty_rows.add(r)
+        self.dirty_cols.add(c)
+        self.touched.add((r, c))
+
+    def mark_all(self):
+        self.dirty_rows.update(range(self.rows))
+        self.dirty_cols.update(range(self.cols))
+        self.touched.update((r, c) for r in range(self.rows) for c in range(self.cols))
+
+    def randomize(self):
+        randint, top = self.rng.randint, self.num_colors - 1
+        self.cells[:] = bytes(randint(0, top) for _ in range(self.rows * self.cols))
+        self.mark_all()
+
+    def swap(self, r1, c1, r2, c2):
+        cells, cols = self.cells, self.cols
+        i, j = r1 * cols + c1, r2 * cols + c2
+        cells[i], cells[j] = cells[j], cells[i]
+        self.dirty_rows.update((r1, r2))
+        self.dirty_cols.update((c1, c2))
+        self.touched.update(((r1, c1), (r2, c2)))
+
+    def clear(self, positions):
+        cells, cols = self.cells, self.cols
+        for r, c in positions:
+            cells[r * cols + c] = EMPTY
+            self.dirty_rows.add(r)
+            self.dirty_cols.add(c)
+            self.touched.add((r, c))
+
+    # ------------------------------------------
+    # Match detection (run-length over rows/columns)
+    # ------------------------------------------
+    @staticmethod
+    def _runs(line):
+        """Yield (start, end) of every run of three or more equal non-empty cells."""
+        n, i = len(line), 0
+        while i < n - 2:
+            v = line[i]
+            if line[i + 1] == v and line[i + 2] == v and v != EMPTY:
+                end = i + 3
+                while end < n and line[end] == v:
+                    end += 1
+                yield i, end
+                i = end
+            else:
+                i += 1
+
+    def _row_runs(self, r, out):
+        cols = self.cols
+        for start, end in self._runs(self.cells[r * cols:(r + 1) * cols]):
+            out.update((r, c) for c in range(start, end))
+
+    def _col_runs(self, c, out):
+        for start, end in self._runs(self.cells[c::self.cols]):
+            out.update((r, c) for r in range(start, end))
+
+    def find_all_matches(self):
+        matched = set()
+        for r in range(self.rows):
+            self._row_runs(r, matched)
+        for c in range(self.cols):
+            self._col_runs(c, matched)
+        return list(matched)
+
+    def find_matches(self):
+        """Scan only the rows and columns touched since the board was last clean.
+
+        Any run of three must pass through a changed cell, so this returns the
+        same set as find_all_matches() as long as cells are only changed through
+        the Board methods. Dirty lines are kept until a scan comes back empty.
+        """
+        matched = set()
+        for r in self.dirty_rows:
+            self._row_runs(r, matched)
+        for c in self.dirty_cols:
+            self._col_runs(c, matched)
+        if not matched:
+            self.dirty_rows.clear()
+            self.dirty_cols.clear()
+        return list(matched)
+
+    def _line_length(self, r, c, color_id):
+        """Longest row/column run through (r, c) if it held color_id."""
+        cells, cols, rows = self.cells, self.cols, self.rows
+        left = c
+        while left > 0 and cells[r * cols + left - 1] == color_id:
+            left -= 1
+        right = c
+        while right < cols - 1 and cells[r * cols + right + 1] == color_id:
+            right += 1
+        up = r
+        while up > 0 and cells[(up - 1) * cols + c] == color_id:
+            up -= 1
+        down = r
+        while down < rows - 1 and cells[(down + 1) * cols + c] == color_id:
+            down += 1
+        return max(right - left, down - up) + 1
+
+    def is_legal_swap(self, r1, c1, r2, c2):
+        """True if swapping two neighbouring cells would create a match."""
+        cells, cols = self.cells, self.cols
+        i, j = r1 * cols + c1, r2 * cols + c2
+        a, b = cells[i], cells[j]
+        if a == b or a == EMPTY or b == EMPTY:
+            return False
+        cells[i], cells[j] = b, a
+        legal = self._line_length(r1, c1, b) >= 3 or self._line_length(r2, c2, a) >= 3
+        cells[i], cells[j] = a, b
+        return legal
+
+    def _iter_legal_moves(self):
+        """Yield every legal swap, checking the two cells each side on a padded copy.
+
+        Same answers as is_legal_swap(), but each swap is a handful of byte
+        compares with no bounds checks: the board is copied into a grid with
+        a two-cell EMPTY border, and EMPTY never equals a real color.
+        """
+        rows, cols = self.rows, self.cols
+        w = cols + 4
+        g = bytearray((EMPTY,)) * (w * (rows + 4))
+        cells = self.cells
+        for r in range(rows):
+            start = (r + 2) * w + 2
+            g[start:start + cols] = cells[r * cols:(r + 1) * cols]
+        w2 = 2 * w
+        for r in range(rows):
+            base = (r + 2) * w + 2
+            for c in range(cols):
+                i = base + c
+                a = g[i]
+                if a == EMPTY:
+                    continue
+                # Swap with the right neighbour: b lands on i, a lands on j.
+                j = i + 1
+                b = g[j]
+                if b != a and b != EMPTY and (
+                        g[i - 1] == b == g[i - 2] or g[i - w] == b == g[i - w2] or
+                        g[i + w] == b == g[i + w2] or g[i - w] == b == g[i + w] or
+                        g[j + 1] == a == g[j + 2] or g[j - w] == a == g[j - w2] or
+                        g[j + w] == a == g[j + w2] or g[j - w] == a == g[j + w]):
+                    yield (r, c, r, c + 1)
+                # Swap with the neighbour below.
+                j = i + w
+                b = g[j]
+                if b != a and b != EMPTY and (
+                        g[i - w] == b == g[i - w2] or g[i - 1] == b == g[i - 2] or
+                        g[i + 1] == b == g[i + 2] or g[i - 1] == b == g[i + 1] or
+                        g[j + w] == a == g[j + w2] or g[j - 1] == a == g[j - 2] or
+                        g[j + 1] == a == g[j + 2] or g[j - 1] == a == g[j + 1]):
+                    yield (r, c, r + 1, c)
+
+    def legal_moves(self):
+        return list(self._iter_legal_moves())
+
+    def has_legal_move(self):
+        return next(self._iter_legal_moves(), None) is not None
+
+    # ------------------------------------------
+    # Clean fills & reshuffles
+    # ------------------------------------------
+    def _pick_colors(self, pick):
+        """Fill cells in row-major order, avoiding colors that would complete
+        a run of three with the two cells to the left or above.
+
+        `pick(allowed)` returns a color id from the allowed list, or None if
+        nothing fits. Returns False if some cell had no allowed color.
+        """
+        cells, cols = self.cells, self.cols
+        colors = range(self.num_colors)
+        clean = True
+        for r in range(self.rows):
+            for c in range(cols):
+                i = r * cols + c
+                banned_h = cells[i - 1] if c >= 2 and cells[i - 1] == cells[i - 2] else EMPTY
+                banned_v = cells[i - cols] if r >= 2 and cells[i - cols] == cells[i - 2 * cols] else EMPTY
+                color_id = pick([k for k in colors if k != banned_h and k != banned_v])
+                if color_id is None:
+                    clean = False
+                    color_id = pick(list(colors))
+                cells[i] = color_id
+        return clean
+
+    def fill(self, attempts=32):
+        """Fill with random colors so there are no matches and at least one move."""
+        rng = self.rng
+        pick = lambda allowed: rng.choice(allowed) if allowed else None
+        for _ in range(attempts):
+            if self._pick_colors(pick) and self.has_legal_move():
+                break
+        self.mark_all()
+
+    def shuffle(self, attempts=32):
+        """Rearrange the current colors into a board with no matches and a legal move.
+
+        Falls back to fill() if the color counts make that impossible.
+        """
+        rng = self.rng
+        original = bytes(self.cells)
+        for _ in range(attempts):
+            counts = [original.count(k) for k in range(self.num_colors)]
+
+            def pick(allowed):
+                weights = [counts[k] for k in allowed]
+                if not any(weights):
+                    return None
+                color_id = rng.choices(allowed, weights)[0]
+                counts[color_id] -= 1
+                return color_id
+
+            if self._pick_colors(pick) and self.has_legal_move():
+                self.mark_all()
+                return
+        self.fill(attempts)
+
+    # ------------------------------------------
+    # Gravity & refill
+    # ------------------------------------------
+    def apply_gravity(self):
+        """Drop tiles into gaps and refill from the top.
+
+        Returns a list of (col, num_new) for every column that changed.
+        """
+        cells, cols, rows = self.cells, self.cols, self.rows
+        randint, top = self.rng.randint, self.num_colors - 1
+        empty = bytes((EMPTY,))
+        changed = []
+        lowest = -1
+        for c in range(cols):
+            column = bytes(cells[c::cols])
+            if EMPTY not in column:
+                continue
+            gap = column.rfind(empty)
+            lowest = max(lowest, gap)
+            self.touched.update((r, c) for r in range(gap + 1))
+            existing = column.replace(empty, b"")
+            num_new = rows - len(existing)
+            refill = bytes(randint(0, top) for _ in range(num_new))
+            cells[c::cols] = refill + existing
+            changed.append((c, num_new))
+            self.dirty_cols.add(c)
+        # Cells below the lowest gap never move, so only rows above it can match.
+        self.dirty_rows.update(range(lowest + 1))
+        return changed
+
+    def resolve(self):
+        """Clear matches and apply gravity until the board settles.
+
+        Returns (cascades, tiles_cleared).
+        """
+        cascades = cleared = 0
+        matches = self.find_matches()
+        while matches:
+            cascades += 1
+            cleared += len(matches)
+            self.clear(matches)
+            self.apply_gravity()
+            matches = self.find_matches()
+        return cascades, cleared
+
+
+# ==========================================
+# 2. LEGAL MOVE INDEX
+# ==========================================
+class MoveIndex:
+    """Set of legal swaps kept in step with a Board.
+
+    A swap's legality only depends on cells within three steps of it, so when
+    the board reports touched cells only the swaps anchored around them are
+    re-checked. Moves are (r1, c1, r2, c2) with the right/lower cell second.
+    """
+
+    __slots__ = ("board", "moves")
+
+    def __init__(self, board):
+        self.board = board
+        self.moves = set()
+        self.rebuild()
+
+    def rebuild(self):
+        self.board.touched.clear()
+        self.moves = set(self.board.legal_moves())
+
+    def refresh(self):
+        board = self.board
+        touched = board.touched
+        if not touched:
+            return
+        rows, cols = board.rows, board.cols
+        if len(touched) * 4 >= rows * cols:
+            self.rebuild()
+            return
+        anchors = set()
+        for r, c in touched:
+            for ar in range(max(0, r - 3), min(rows, r + 3)):
+                for ac in range(max(0, c - 3), min(cols, c + 3)):
+                    anchors.add((ar, ac))
+        touched.clear()
+        moves, is_legal = self.moves, board.is_legal_swap
+        for r, c in anchors:
+            if c + 1 < cols:
+                move = (r, c, r, c + 1)
+                if is_legal(*move):
+                    moves.add(move)
+                else:
+                    moves.discard(move)
+            if r + 1 < rows:
+                move = (r, c, r + 1, c)
+                if is_legal(*move):
+                    moves.add(move)
+                else:
+                    moves.discard(move)
+
+    def has_move(self):
+        self.refresh()
+        return bool(self.moves)
+
+    def hint(self):
+        self.refresh()
+        return next(iter(self.moves), None)
+
+    def is_legal(self, r1, c1, r2, c2):
+        self.refresh()
+        if (r2, c2) < (r1, c1):
+            r1, c1, r2, c2 = r2, c2, r1, c1
+        return (r1, c1, r2, c2) in self.moves
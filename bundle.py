@@ -0,0 +1,90 @@
+import argparse
+import json
+import os
+import shutil
+import struct
+import sys
+import zlib
+
+import pygame
+
+from assets import BUNDLE_MAGIC, decode_image, image_specs
+from main import BUNDLE_PATH, SCREEN_WIDTH, TILE_SIZE
+
+EFFECT_SOUNDS = ["party_girl_1", "party_girl_2", "party_girl_5"]
+
+
+# ==========================================
+# 1. BUNDLE WRITER
+# ==========================================
+def build_bundle(out_path, web=False):
+    """Pre-scale every image and pack it (plus desktop sound effects) into one file.
+
+    The browser plays sound effects through HTML Audio by URL, so web bundles
+    carry images only and the .ogg files ship next to them.
+    """
+    header = {"images": {}, "sounds": {}}
+    payload = bytearray()
+
+    for name, spec in image_specs(SCREEN_WIDTH, TILE_SIZE).items():
+        img = decode_image(**spec)
+        if not img.get_flags() & pygame.SRCALPHA:
+            rgba = pygame.Surface(img.get_size(), pygame.SRCALPHA)
+            rgba.blit(img, (0, 0))
+            img = rgba
+        blob = zlib.compress(pygame.image.tobytes(img, "RGBA"), 9)
+        header["images"][name] = {"size": list(img.get_size()), "offset": len(payload), "length": len(blob)}
+        payload += blob
+
+    if not web:
+        for name in EFFECT_SOUNDS:
+            with open(f"assets/sounds/{name}.mp3", "rb") as f:
+                blob = f.read()
+            header["sounds"][name] = {"format": "mp3", "offset": len(payload), "length": len(blob)}
+            payload += blob
+
+    raw_header = json.dumps(header, separators=(",", ":")).encode()
+    tmp_path = out_path + ".tmp"
+    try:
+        with open(tmp_path, "wb") as f:
+            f.write(BUNDLE_MAGIC)
+            f.write(struct.pack("<I", len(raw_header)))
+            f.write(raw_header)
+            f.write(payload)
+        os.replace(tmp_path, out_path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    return os.path.getsize(out_path)
+
+def stage_web(stage_dir):
+    """Copy just what the pygbag build needs into stage_dir (run pygbag on that folder)."""
+    if os.path.exists(stage_dir):
+        shutil.rmtree(stage_dir)
+    os.makedirs(os.path.join(stage_dir, "assets", "sounds"))
+    for name in os.listdir("."):
+        if name.endswith(".py") or name == "favicon.png":
+            shutil.copy2(name, stage_dir)
+    size = build_bundle(os.path.join(stage_dir, BUNDLE_PATH), web=True)
+    for name in EFFECT_SOUNDS:
+        shutil.copy2(f"assets/sounds/{name}.ogg", os.path.join(stage_dir, "assets", "sounds"))
+    shutil.copy2("assets/sounds/background_track.mp3", os.path.join(stage_dir, "assets", "sounds"))
+    return size
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build the pre-scaled asset bundle")
+    parser.add_argument("--out", default=BUNDLE_PATH)
+    parser.add_argument("--web", metavar="STAGE_DIR",
+                        help="stage a pygbag build folder with a web bundle and .ogg audio only")
+    args = parser.parse_args(argv)
+
+    if args.web:
+        size = stage_web(args.web)
+        print(f"[BUNDLE] staged web build in {args.web} (bundle {size / 1024:.0f} KiB)")
+    else:
+        size = build_bundle(args.out)
+        print(f"[BUNDLE] wrote {args.out} ({size / 1024:.0f} KiB)")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,160 @@
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import time
+
+from board import Board
+from server import encode
+
+
+# ==========================================
+# 1. SIMULATED GUEST
+# ==========================================
+class Guest:
+    """A scripted client that mirrors its board from the server's state and diffs.
+
+    It plays a random legal move from its mirror every `interval` seconds
+    (with jitter) and times each move until the diff acknowledging it
+    arrives. Rejected moves mean the mirror went out of sync.
+    """
+
+    def __init__(self, guest_id, address, port, interval, rng):
+        self.id = guest_id
+        self.address = address
+        self.port = port
+        self.interval = interval
+        self.rng = rng
+        self.board = None
+        self.seq = 0
+        self.sent = {}
+        self.latencies = []
+        self.rejected = 0
+        self.leader_updates = 0
+
+    async def run(self, stop_at):
+        reader, writer = await asyncio.open_connection(self.address, self.port)
+        writer.write(encode({"t": "join", "name": f"guest{self.id}"}))
+        listener = asyncio.create_task(self.listen(reader))
+        try:
+            await asyncio.sleep(self.rng.uniform(0, self.interval))
+            while time.perf_counter() < stop_at:
+                if self.board is not None and not self.sent:
+                    moves = self.board.legal_moves()
+                    if moves:
+                        self.seq += 1
+                        self.sent[self.seq] = time.perf_counter()
+                        writer.write(encode({"t": "swap", "seq": self.seq, "m": self.rng.choice(moves)}))
+                await asyncio.sleep(self.interval * self.rng.uniform(0.5, 1.5))
+        finally:
+            writer.close()
+            listener.cancel()
+
+    async def listen(self, reader):
+        while True:
+            line = await reader.readline()
+            if not line:
+                return
+            msg = json.loads(line)
+            kind = msg["t"]
+            if kind == "state":
+                self.board = Board(msg["rows"], msg["cols"])
+                self.board.cells[:] = bytes(msg["cells"])
+            elif kind == "diff":
+                now = time.perf_counter()
+                cells = self.board.cells
+                for i, color_id in msg["cells"]:
+                    cells[i] = color_id
+                self.rejected += msg["rejected"]
+                for seq in [s for s in self.sent if s <= msg["ack"]]:
+                    self.latencies.append(now - self.sent.pop(seq))
+            elif kind == "leaders":
+                self.leader_updates += 1
+
+# ==========================================
+# 2. LOAD TEST
+# ==========================================
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+async def wait_for_server(address, port, timeout=10.0):
+    deadline = time.perf_counter() + timeout
+    while True:
+        try:
+            _, writer = await asyncio.open_connection(address, port)
+            writer.close()
+            return
+        except OSError:
+            if time.perf_counter() > deadline:
+                raise
+            await asyncio.sleep(0.05)
+
+async def run_guests(args, port):
+    await wait_for_server("127.0.0.1", port)
+    rng = random.Random(args.seed)
+    stop_at = time.perf_counter() + args.duration
+    guests = [Guest(i, "127.0.0.1", port, args.interval, random.Random(rng.getrandbits(32)))
+              for i in range(args.sessions)]
+    await asyncio.gather(*(g.run(stop_at) for g in guests))
+    return guests
+
+def percentile(sorted_values, p):
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, (len(sorted_values) - 1) * p // 100)]
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Load-test the session host with scripted guests")
+    parser.add_argument("--sessions", type=int, default=200)
+    parser.add_argument("--duration", type=float, default=20.0, help="seconds of play")
+    parser.add_argument("--interval", type=float, default=1.0, help="mean seconds between a guest's moves")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", help="also write the results as JSON")
+    args = parser.parse_args(argv)
+
+    port = free_port()
+    before = os.times()
+    server = subprocess.Popen([sys.executable, os.path.join(os.path.dirname(os.path.abspath(__file__)), "server.py"),
+                               "--port", str(port), "--seed", str(args.seed)])
+    start = time.perf_counter()
+    try:
+        guests = asyncio.run(run_guests(args, port))
+    finally:
+        server.terminate()
+        server.wait()
+    wall = time.perf_counter() - start
+    after = os.times()
+    server_cpu = (after.children_user - before.children_user) + (after.children_system - before.children_system)
+
+    latencies = sorted(l * 1000 for g in guests for l in g.latencies)
+    moves = len(latencies)
+    load = server_cpu / wall
+    results = {
+        "sessions": args.sessions,
+        "duration_s": round(wall, 2),
+        "moves": moves,
+        "moves_per_s": round(moves / wall, 1),
+        "latency_p50_ms": round(percentile(latencies, 50), 2),
+        "latency_p99_ms": round(percentile(latencies, 99), 2),
+        "rejected": sum(g.rejected for g in guests),
+        "server_cpu_s": round(server_cpu, 2),
+        "server_core_load": round(load, 3),
+        "sessions_per_core": round(args.sessions / load) if load else None,
+    }
+    print(f"[LOAD] {args.sessions} sessions, {moves} moves ({results['moves_per_s']}/s), "
+          f"latency p50 {results['latency_p50_ms']} ms p99 {results['latency_p99_ms']} ms, "
+          f"server {load:.0%} of a core -> ~{results['sessions_per_core']} sessions/core at this move rate, "
+          f"{results['rejected']} rejected", file=sys.stderr)
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(results, f, indent=2)
+    return 1 if results["rejected"] else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,12 +1,29 @@
+import sys
+
+# The headless simulator runs without pygame, so dispatch to it before
+# pygame or the renderer is imported.
+if __name__ == "__main__" and "--simulate" in sys.argv:
+    from simulate import main as simulate_main
+    sys.exit(simulate_main(sys.argv[1:]))
+
 import pygame
 import asyncio
 import random
 import math
-import sys
-
-IS_WEB = sys.platform == "emscripten"
-if IS_WEB:
-    import platform as _platform
+import os
+import time
+import zlib
+
+from assets import AssetManager, Bundle, LazyCache, image_specs
+from audio import AudioManager
+from board import Board, MoveIndex
+from pacing import AMBIENT_FPS, FramePacer
+from particles import ParticleSystem
+from profiler import FrameProfiler
+from quality import TIERS, QualityGovernor, tier_index
+from render import BeamCache, Compositor, FlashDiscs, StaticLayer, TileAtlas, glitch_band
+from replay import SEED_MASK, InputRecorder, Replay
+from solver import Solver
 
 # ==========================================
 # 1. SETUP CONSTANTS & CONFIGURATION
@@ -21,6 +38,21 @@ BOARD_HEIGHT = GRID_SIZE * TILE_SIZE
 BOARD_X = (SCREEN_WIDTH - BOARD_WIDTH) // 2
 BOARD_Y = 320
 
+TICK_RATE = 60            # simulation ticks per second, independent of the frame rate
+TICK_SECONDS = 1 / TICK_RATE
+MAX_CATCH_UP = 0.25       # seconds of simulation run in one frame before the game slows down
+HINT_AFTER = 5 * TICK_RATE        # idle ticks before the best move is highlighted
+ATTRACT_AFTER = 30 * TICK_RATE    # idle ticks before the game starts playing itself
+ATTRACT_INTERVAL = TICK_RATE      # ticks between moves in attract mode
+SEARCH_MOVES_PER_TICK = 2         # root moves the hint search evaluates per tick (~0.3 ms each)
+BEAM_CACHE_BYTES = 64 << 20       # cap on cached beam frames, see render.BeamCache
+
+BUNDLE_PATH = "assets/bundle.bin"
+
+# Every FrameProfiler.mark() phase, in frame order; these are the profile CSV columns.
+PROFILE_PHASES = ("events", "resolve", "glitch", "animate", "beams", "flash", "title", "disco_ball",
+                  "extras", "board", "particles", "present", "audio", "wait")
+
 BRAT_GREEN = (138, 206, 0)
 BLACK = (0, 0, 0)
 WHITE = (255, 255, 255)
@@ -29,15 +61,25 @@ WHITE = (255, 255, 255)
 # 2. TILE CLASS
 # ==========================================
 class Tile:
+    """Animated view of one board cell; the color lives in the Board.
+
+    visual_x/visual_y are the position after the latest tick and prev_x/prev_y
+    the one before it, so drawing can interpolate between the two.
+    """
+
+    __slots__ = ("row", "col", "color_id", "visual_x", "visual_y", "prev_x", "prev_y", "speed")
+
     def __init__(self, row, col, color_id, start_y=None):
         self.row = row
         self.col = col
         self.color_id = color_id
         self.visual_x = col * TILE_SIZE
         self.visual_y = start_y if start_y is not None else row * TILE_SIZE
+        self.prev_x, self.prev_y = self.visual_x, self.visual_y
         self.speed = 12
 
     def update(self):
+        self.prev_x, self.prev_y = self.visual_x, self.visual_y
         target_y = self.row * TILE_SIZE
         if self.visual_y < target_y:
             self.visual_y = min(self.visual_y + self.speed, target_y)
@@ -53,29 +95,21 @@ class Tile:
 # ==========================================
 # 3. CORE GAME LOGIC
 # ==========================================
-def find_matches(grid):
-    matched_indices = set()
-    for r in range(GRID_SIZE):
-        for c in range(GRID_SIZE - 2):
-            t1, t2, t3 = grid[r][c], grid[r][c+1], grid[r][c+2]
-            if t1 and t2 and t3 and t1.color_id == t2.color_id == t3.color_id:
-                matched_indices.update([(r, c), (r, c+1), (r, c+2)])
-    for r in range(GRID_SIZE - 2):
-        for c in range(GRID_SIZE):
-            t1, t2, t3 = grid[r][c], grid[r+1][c], grid[r+2][c]
-            if t1 and t2 and t3 and t1.color_id == t2.color_id == t3.color_id:
-                matched_indices.update([(r, c), (r+1, c), (r+2, c)])
-    return list(matched_indices)
-
-def apply_gravity(grid):
-    for c in range(GRID_SIZE):
-        existing_tiles = [grid[r][c] for r in range(GRID_SIZE) if grid[r][c] is not None]
-        num_new = GRID_SIZE - len(existing_tiles)
-        for r in range(GRID_SIZE):
+def make_tiles(board):
+    return [[Tile(r, c, board.get(r, c)) for c in range(board.cols)] for r in range(board.rows)]
+
+def find_matches(board):
+    return board.find_matches()
+
+def apply_gravity(board, grid):
+    """Apply gravity to the board and mirror the moves onto the tile view."""
+    for c, num_new in board.apply_gravity():
+        existing_tiles = [grid[r][c] for r in range(board.rows) if grid[r][c] is not None]
+        for r in range(board.rows):
             grid[r][c] = None
         for r in range(num_new):
             start_y = -(r + 1) * TILE_SIZE
-            grid[r][c] = Tile(r, c, random.randint(0, 3), start_y=start_y)
+            grid[r][c] = Tile(r, c, board.get(r, c), start_y=start_y)
         for i, tile in enumerate(existing_tiles):
             new_row = num_new + i
             tile.row = new_row
@@ -93,90 +127,372 @@ def get_tinted_surface(surface, color):
     tinted.fill(color, special_flags=pygame.BLEND_RGB_MULT)
     return tinted
 
-def load_image(path, size=None, smooth=False):
-    """Load an image, optionally scale it. Returns None on failure."""
-    try:
-        img = pygame.image.load(path).convert_alpha()
-        if size:
-            if smooth:
-                img = pygame.transform.smoothscale(img, size)
-            else:
-                img = pygame.transform.scale(img, size)
-        return img
-    except:
-        return None
-
 # ==========================================
-# 5. MAIN GAME ENGINE
+# 4. GAME SCENE
 # ==========================================
-async def main():
-    pygame.init()
-    screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
-    pygame.display.set_caption("Annelliese's 30th Birthday Match-3")
-    clock = pygame.time.Clock()
+class Game:
+    """The board and the party scene around it.
+
+    update() advances one fixed tick (1 / TICK_RATE s), draw() queues a
+    frame on a Compositor interpolated `alpha` of the way from the previous
+    tick, and handle_event() applies player input. Ticks never depend on
+    drawing and nothing here touches the display or the mixer, so the same
+    scene runs in the window, in benchmarks and in replays. Every random
+    choice comes from `rng`, so one seed plays the same game every run.
+    on_match(count) is called for every match.
+    """
 
-    # --- ASSET LOADING ---
-    disco_ball_img = load_image("assets/images/disco_ball.png", (225, 225))
-    if not disco_ball_img:
-        disco_ball_img = pygame.Surface((225, 225), pygame.SRCALPHA)
-        pygame.draw.circle(disco_ball_img, (200, 200, 200), (112, 112), 110)
-
-    neon_sign_img = load_image("assets/images/neon_sign.png", (200, 100))
+    tile_id_colors = [(255, 0, 255), (0, 255, 255), (229, 237, 35), (255, 255, 255)]
+    birthday_flash_colors = [(255, 255, 255), (0, 0, 0), (255, 255, 0), (255, 0, 255), (0, 255, 255), (255, 80, 0), (255, 0, 0), (130, 0, 255)]
     neon_flash_colors = [(255, 50, 50), (50, 255, 50), (50, 50, 255), (255, 255, 50), (255, 50, 255)]
+    light_colors = [(255, 255, 255, 60), (255, 20, 147, 80), (0, 191, 255, 80), (138, 43, 226, 80)]
+    lenses = [(110, 19, False), (75, 80, True), (125, 50, True), (168, 38, True), (215, 55, True), (270, 90, True), (180, -30, False), (240, 19, False)]
+    pap_x1, pap_y1 = 20, 150
+    pap_x2, pap_y2 = 20, 50
+    vip_x, vip_y = 80, 90
 
-    mystery_machine_img = load_image("assets/images/mystery_machine.png", (300, 200))
-    crowd_img = load_image("assets/images/crowd.png", (SCREEN_WIDTH, 300))
-    charli_img = load_image("assets/images/charli.png", (300, 390))
-    scooby_img = load_image("assets/images/scooby.png", (150, 180))
-    booth_left = load_image("assets/images/booth.png", (350, 250))
-    addison_img = load_image("assets/images/addison.png", (150, 200))
-    paparazzi_img = load_image("assets/images/paparazzi.png", (350, 150))
-    homer_img = load_image("assets/images/homer.png", (127, 153))
+    def __init__(self, images, on_match=None, prof=None, rng=None, quality=None):
+        self.on_match = on_match
+        self.rng = rng if rng is not None else random.Random()
+        self.prof = prof if prof is not None else FrameProfiler()
+
+        # --- LOADED ASSETS ---
+        self.disco_ball_img = images.get("disco_ball")
+        if not self.disco_ball_img:
+            self.disco_ball_img = pygame.Surface((225, 225), pygame.SRCALPHA)
+            pygame.draw.circle(self.disco_ball_img, (200, 200, 200), (112, 112), 110)
+        self.crowd_img = images.get("crowd")
+        self.addison_img = images.get("addison") if images.get("mystery_machine") else None
+        self.paparazzi_img = images.get("paparazzi")
+        self.vip_photo = images.get("vip_photo")
+        annie_photos = [img for img in (images.get(f"anneliese_{i}") for i in range(1, 5)) if img]
+
+        # --- LAZY CACHES (built on first use) ---
+        self.font_cache = {}
+        neon_sign_img = images.get("neon_sign")
+        self.neon_tinted = None
+        if neon_sign_img:
+            self.neon_tinted = LazyCache(lambda i: get_tinted_surface(neon_sign_img, self.neon_flash_colors[i]),
+                                         len(self.neon_flash_colors))
+        self.title_renders = LazyCache(self._render_title, len(self.birthday_flash_colors))
+
+        # --- PRE-CREATE REUSABLE SURFACES ---
+        self.flash_discs = FlashDiscs()
+        self.vip_glow = None
+        if self.vip_photo:
+            self.vip_glow = self.vip_photo.copy()
+            self.vip_glow.fill((120, 120, 120), special_flags=pygame.BLEND_RGB_ADD)
+        self.pop_surface = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT))
+        self.pop_surface.fill(WHITE)
+        self.pop_surface.set_alpha(60)
+        self.particle_cache = LazyCache(make_particle_surface)
+        self.particles = ParticleSystem()
+        self.particles.bake(self.tile_id_colors, self.particle_cache)
+        self.beam_cache = None
+        self.set_quality(quality or TIERS[0])
+
+        # --- STATIC LAYERS ---
+        self.vip_layer = StaticLayer([(images.get("paparazzi_2"), (self.pap_x2, self.pap_y2)),
+                                      (self.vip_photo, (self.vip_x, self.vip_y))])
+        scenery = []
+        if images.get("booth"):
+            scenery += [(images.get("booth"), (20, 580)), (images.get("homer"), (210, 580)),
+                        (images.get("pink"), (160, 610)), (images.get("scooby"), (70, 540))]
+        if images.get("mystery_machine"):
+            scenery.append((images.get("mystery_machine"), (SCREEN_WIDTH - 300, 300)))
+        scenery.append((images.get("charli"), (SCREEN_WIDTH - 270, SCREEN_HEIGHT - 450)))
+        self.scenery_layer = StaticLayer(scenery)
+        self.particle_area = pygame.Rect(BOARD_X, BOARD_Y, BOARD_WIDTH, BOARD_HEIGHT).inflate(220, 220)
+        self.tile_atlas = TileAtlas(self.tile_id_colors, annie_photos, TILE_SIZE, BLACK, BRAT_GREEN)
+
+        # --- INIT GAME STATE ---
+        self.board = Board(GRID_SIZE, num_colors=4, rng=self.rng)
+        self.board.fill()
+        self.move_index = MoveIndex(self.board)
+        self.grid = make_tiles(self.board)
+        self.current_light_color = self.light_colors[0]
+        self.selected_tile = None
+        self.solver = Solver(depth=1, samples=2)
+        self.hint = None
+        self.search, self.search_best = None, None
+        self.idle_ticks = 0
+        self.color_timer = 0
+        self.ball_angle = 0
+        self.glitch_timer, self.glitch_active, self.glitch_rects = 0, False, []
+        self.glitch_drawn, self.glitch_bands = None, []
+        self.flash_timer, self.flash_active, self.current_lens = 0, False, (0, 0)
+        self.top_y = 0
+        self.alpha = 1.0
+
+    def set_quality(self, tier):
+        """Apply a quality.TIERS entry to the effects."""
+        self.quality = tier
+        cache = self.beam_cache
+        if not tier.beams:
+            self.beam_cache = None
+        elif cache is None or (cache.beams, cache.step) != (tier.beams, tier.beam_step):
+            self.beam_cache = BeamCache((SCREEN_WIDTH, SCREEN_HEIGHT), (SCREEN_WIDTH // 2, 110),
+                                        beams=tier.beams, step=tier.beam_step, colors=len(self.light_colors),
+                                        max_bytes=BEAM_CACHE_BYTES)
+        self.particles.limit = tier.max_particles
+
+    def _render_title(self, i):
+        if "title" not in self.font_cache:
+            try:
+                self.font_cache["title"] = pygame.font.SysFont("Arial Narrow, Arial", 85, bold=True)
+            except:
+                self.font_cache["title"] = pygame.font.SysFont("Arial", 85, bold=True)
+        font, col = self.font_cache["title"], self.birthday_flash_colors[i]
+        return font.render("happy 30 birthday", True, col), font.render("anneliese", True, col)
+
+    # ------------------------------------------
+    # Input
+    # ------------------------------------------
+    def handle_event(self, event):
+        if event.type != pygame.MOUSEBUTTONDOWN:
+            return
+        self.idle_ticks, self.hint, self.search = 0, None, None
+        if not is_board_stable(self.grid):
+            return
+        mouse_x, mouse_y = event.pos
+        if BOARD_X <= mouse_x <= BOARD_X + BOARD_WIDTH and BOARD_Y <= mouse_y <= BOARD_Y + BOARD_HEIGHT:
+            col, row = (mouse_x - BOARD_X) // TILE_SIZE, (mouse_y - BOARD_Y) // TILE_SIZE
+            if self.selected_tile is None:
+                self.selected_tile = (row, col)
+            else:
+                self.try_swap(self.selected_tile, (row, col))
+                self.selected_tile = None
+
+    def try_swap(self, a, b):
+        (r1, c1), (r2, c2) = a, b
+        if abs(r1 - r2) + abs(c1 - c2) != 1 or not self.move_index.is_legal(r1, c1, r2, c2):
+            return False
+        grid = self.grid
+        self.board.swap(r1, c1, r2, c2)
+        grid[r1][c1], grid[r2][c2] = grid[r2][c2], grid[r1][c1]
+        grid[r1][c1].row, grid[r1][c1].col = r1, c1
+        grid[r2][c2].row, grid[r2][c2].col = r2, c2
+        return True
+
+    # ------------------------------------------
+    # Simulation
+    # ------------------------------------------
+    def resolve(self):
+        """Clear matches on a settled board, or reshuffle it once no move is left."""
+        board, grid = self.board, self.grid
+        if not is_board_stable(grid):
+            return
+        matches = find_matches(board)
+        if matches:
+            if self.on_match:
+                self.on_match(len(matches))
+            n_colors, rng = len(self.tile_id_colors), self.rng
+            for r, c in matches:
+                t = grid[r][c]
+                if t:
+                    px, py = BOARD_X + t.visual_x + TILE_SIZE // 2, BOARD_Y + t.visual_y + TILE_SIZE // 2
+                    p_col = t.color_id % n_colors
+                    for _ in range(rng.randint(4, 6)):
+                        self.particles.emit(px, py, rng.uniform(-4, 4), rng.uniform(-4, 4), p_col)
+                grid[r][c] = None
+            board.clear(matches)
+            apply_gravity(board, grid)
+        elif not self.move_index.has_move():
+            board.shuffle()
+            for row in grid:
+                for t in row:
+                    t.color_id = board.get(t.row, t.col)
+
+    def autoplay(self):
+        """Highlight the solver's move once the player is idle; later, play it (attract mode).
+
+        The search runs SEARCH_MOVES_PER_TICK root moves per tick rather
+        than all at once, so it never stalls a frame. It is counted in
+        moves, not time, so replays pick the same hint on the same tick.
+        """
+        if not is_board_stable(self.grid):
+            self.search = None
+            return
+        if self.hint is None:
+            if self.search is None:
+                self.search, self.search_best = self.solver.search(self.board), None
+            for _ in range(SEARCH_MOVES_PER_TICK):
+                result = next(self.search, None)
+                if result is None:
+                    self.hint = self.search_best[1] if self.search_best else None
+                    self.search = None
+                    break
+                self.search_best = max(self.search_best or result, result)
+        if self.hint and self.idle_ticks >= ATTRACT_AFTER and self.idle_ticks % ATTRACT_INTERVAL == 0:
+            r1, c1, r2, c2 = self.hint
+            self.selected_tile, self.hint = None, None
+            self.try_swap((r1, c1), (r2, c2))
 
-    pink_img = None
-    try:
-        pink_raw = pygame.image.load("assets/images/pink.png").convert_alpha()
-        p_orig_w, p_orig_h = pink_raw.get_size()
-        p_target_w = 130
-        p_target_h = int(p_target_w * (p_orig_h / p_orig_w))
-        pink_img = pygame.transform.smoothscale(pink_raw, (p_target_w, p_target_h))
-    except:
-        pass
+    def update(self):
+        prof, rng = self.prof, self.rng
+        self.resolve()
+        self.idle_ticks += 1
+        if self.idle_ticks >= HINT_AFTER:
+            self.autoplay()
+        prof.mark("resolve")
+
+        self.glitch_timer += 1
+        if not self.glitch_active and rng.random() < 0.05:
+            self.glitch_active, self.glitch_timer, self.glitch_rects = True, 0, []
+            for _ in range(rng.randint(2, 6)):
+                g_col = rng.choice(self.birthday_flash_colors) + (rng.randint(40, 150),)
+                self.glitch_rects.append((rng.randint(0, SCREEN_HEIGHT), rng.randint(2, 195), g_col))
+        if self.glitch_active and self.glitch_timer > 7:
+            self.glitch_active = False
+        prof.mark("glitch")
+
+        self.ball_angle += 1.5
+        self.color_timer += 1
+        if self.color_timer % 45 == 0:
+            self.current_light_color = rng.choice(self.light_colors)
+
+        if self.flash_active:
+            self.flash_timer += 1
+            if self.flash_timer > 8:
+                self.flash_active = False
+        if not self.flash_active and rng.random() < 0.035:
+            self.flash_active, self.flash_timer = True, 0
+            choice = rng.choice(self.lenses)
+            base_x = self.pap_x2 if choice[2] else self.pap_x1
+            base_y = self.pap_y2 if choice[2] else self.pap_y1
+            self.current_lens = (base_x + choice[0], base_y + choice[1])
+
+        top_y = 0
+        for row in self.grid:
+            for t in row:
+                if t:
+                    t.update()
+                    top_y = min(top_y, t.prev_y)
+        self.top_y = top_y
+        self.particles.update()
+        prof.mark("animate")
+
+    @property
+    def animating(self):
+        """True while tiles or particles move or the player acted in the last second.
+
+        The lights, beams, flashes, glitches and hint are ambient: they
+        still look right at a lower frame rate.
+        """
+        return (self.idle_ticks < TICK_RATE or self.particles.count > 0
+                or not is_board_stable(self.grid))
+
+    # ------------------------------------------
+    # Rendering
+    # ------------------------------------------
+    def draw_tiles(self, surface):
+        self.tile_atlas.draw(surface, (t for row in self.grid for t in row), (BOARD_X, BOARD_Y),
+                             self.selected_tile, self.alpha)
+
+    def draw_particles(self, surface):
+        self.particles.draw(surface, self.alpha)
+
+    def draw(self, comp, alpha=1.0):
+        prof = self.prof
+        self.alpha = alpha
+        comp.begin()
+
+        # --- LIGHT BEAMS (cached frames) ---
+        if self.beam_cache:
+            comp.blit("beams", self.beam_cache.frame(self.current_light_color, self.ball_angle), (0, 0),
+                      changing=True)
+        prof.mark("beams")
 
-    paparazzi_2_img = load_image("assets/images/paparazzi_2.png")
-    if paparazzi_2_img:
-        p2_w = 350
-        paparazzi_2_img = pygame.transform.smoothscale(paparazzi_2_img, (p2_w, int(p2_w * (768 / 1344))))
+        # --- VIP & PAPARAZZI ---
+        flash_active, flash_timer = self.flash_active, self.flash_timer
+        disc = self.flash_discs.get(flash_timer) if flash_active else None
+        if disc:
+            comp.blit("flash", disc, disc.get_rect(center=self.current_lens).topleft)
 
-    vip_photo = load_image("assets/images/anneliese_photo.png")
-    if vip_photo:
-        vw = int(350 * 0.65)
-        vip_photo = pygame.transform.smoothscale(vip_photo, (vw, int(vw * (1280 / 1775))))
+        comp.layer("vip", self.vip_layer)
+        if self.vip_glow and flash_active and flash_timer < 4:
+            comp.blit("vip_glow", self.vip_glow, (self.vip_x, self.vip_y))
 
-    tile_id_colors = [(255, 0, 255), (0, 255, 255), (229, 237, 35), (255, 255, 255)]
-    birthday_flash_colors = [(255, 255, 255), (0, 0, 0), (255, 255, 0), (255, 0, 255), (0, 255, 255), (255, 80, 0), (255, 0, 0), (130, 0, 255)]
+        if self.paparazzi_img:
+            comp.blit("paparazzi", self.paparazzi_img, (self.pap_x1, self.pap_y1))
 
-    annie_photos = []
-    try:
-        for i in range(1, 5):
-            img = pygame.image.load(f"assets/images/anneliese_{i}.png").convert_alpha()
-            if i == 3:
-                orig_w, orig_h = img.get_size()
-                crop_size = int(min(orig_w, orig_h) * 0.6)
-                crop_x = (orig_w - crop_size) // 2
-                crop_y = (orig_h - crop_size) // 2
-                zoom_surf = pygame.Surface((crop_size, crop_size), pygame.SRCALPHA)
-                zoom_surf.blit(img, (0, 0), (crop_x, crop_y, crop_size, crop_size))
-                img = zoom_surf
-            size = TILE_SIZE - 14
-            img = pygame.transform.smoothscale(img, (size, size))
-            mask = pygame.Surface((size, size), pygame.SRCALPHA)
-            pygame.draw.circle(mask, (255, 255, 255), (size // 2, size // 2), size // 2)
-            img.blit(mask, (0, 0), special_flags=pygame.BLEND_RGBA_MIN)
-            annie_photos.append(img)
-    except:
-        pass
+        if flash_active and flash_timer < 2 and self.quality.pop:
+            comp.blit("pop", self.pop_surface, (0, 0))
+        prof.mark("flash")
+
+        # --- TITLE (cached renders) ---
+        c_idx = (self.color_timer // 15) % len(self.title_renders)
+        l1, l2 = self.title_renders[c_idx]
+        comp.blit("title_1", l1, l1.get_rect(center=(SCREEN_WIDTH // 2, 180)).topleft)
+        comp.blit("title_2", l2, l2.get_rect(center=(SCREEN_WIDTH // 2, 250)).topleft)
+        prof.mark("title")
+
+        # --- DISCO BALL ---
+        sway = self.quality.sway
+        wobble = math.sin(self.ball_angle * 0.05) * 8 if sway else 0
+        comp.blit("disco_ball", self.disco_ball_img, (SCREEN_WIDTH // 2 - 112 + wobble, 5))
+        prof.mark("disco_ball")
+
+        # --- EXTRAS ---
+        if self.crowd_img:
+            comp.blit("crowd", self.crowd_img, (0, 780 + (math.sin(self.ball_angle * 0.1) * 10 if sway else 0)))
+        if self.neon_tinted:
+            comp.blit("neon", self.neon_tinted[(self.color_timer // 30) % len(self.neon_tinted)], (75, 450))
+        if self.addison_img:
+            bop = math.sin(self.color_timer * 0.1) * 10 if sway else 0
+            comp.blit("addison", self.addison_img, (SCREEN_WIDTH - 240, 165 + bop))
+        comp.layer("scenery", self.scenery_layer)
+
+        if self.glitch_active and self.quality.cheap_glitch:
+            # Two thin opaque bands instead of a full-screen alpha blit.
+            for i, (g_y, g_h, g_col) in enumerate(self.glitch_rects[:2]):
+                comp.fill(f"glitch_{i}", g_col[:3], (0, g_y, SCREEN_WIDTH, max(2, g_h // 4)))
+        elif self.glitch_active:
+            # One small strip per band, built once per glitch.
+            if self.glitch_drawn is not self.glitch_rects:
+                self.glitch_drawn = self.glitch_rects
+                self.glitch_bands = [(glitch_band(SCREEN_WIDTH, g_h, g_col), (0, g_y))
+                                     for g_y, g_h, g_col in self.glitch_rects]
+            for i, (band, pos) in enumerate(self.glitch_bands):
+                comp.blit(f"glitch_{i}", band, pos)
+        prof.mark("extras")
 
+        # --- GAME BOARD ---
+        strobe_val = (math.sin(self.color_timer * 0.4) + 1) / 2
+        strobe_color = (int(255 - strobe_val * 50), 255, int(255 - strobe_val * 50))
+        comp.fill("board_frame", BLACK, (BOARD_X - 5, BOARD_Y - 5, BOARD_WIDTH + 10, BOARD_HEIGHT + 10))
+        comp.fill("board_bg", strobe_color, (BOARD_X, BOARD_Y, BOARD_WIDTH, BOARD_HEIGHT))
+        comp.draw("tiles", self.draw_tiles, (BOARD_X, BOARD_Y + self.top_y, BOARD_WIDTH, BOARD_HEIGHT - self.top_y))
+        if self.hint and (self.color_timer // 20) % 2 == 0:
+            r1, c1, r2, c2 = self.hint
+            hint_rect = pygame.Rect(BOARD_X + c1 * TILE_SIZE, BOARD_Y + r1 * TILE_SIZE,
+                                    (c2 - c1 + 1) * TILE_SIZE, (r2 - r1 + 1) * TILE_SIZE)
+            comp.draw("hint", lambda s, r=hint_rect: pygame.draw.rect(s, (255, 0, 255), r, 5, border_radius=10),
+                      hint_rect, tuple(hint_rect))
+        prof.mark("board")
+
+        # --- PARTICLES (ring buffer, one batched blit) ---
+        if self.particles.count:
+            comp.draw("particles", self.draw_particles, self.particle_area)
+        prof.mark("particles")
+
+def make_particle_surface(key):
+    col, alpha = key
+    p_surf = pygame.Surface((6, 6))
+    p_surf.fill(col)
+    p_surf.set_alpha(alpha)
+    return p_surf
+
+# ==========================================
+# 5. MAIN GAME ENGINE
+# ==========================================
+async def main(profile=False, profile_csv=None, seed=None, record_path=None, quality=None,
+               ambient_fps=AMBIENT_FPS):
+    pygame.init()
+    screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
+    pygame.display.set_caption("Annelliese's 30th Birthday Match-3")
+
+    # --- FONTS (needed for the loading screen) ---
     try:
         font_small = pygame.font.SysFont("Arial Narrow", 24)
         font_brat = pygame.font.SysFont("Arial", 75, bold=True)
@@ -184,325 +500,198 @@ async def main():
         font_small = pygame.font.SysFont("Arial", 24)
         font_brat = pygame.font.SysFont("Arial", 60)
 
-    try:
-        font_brat_title = pygame.font.SysFont("Arial Narrow, Arial", 85, bold=True)
-    except:
-        font_brat_title = pygame.font.SysFont("Arial", 85, bold=True)
-
-    # --- PRE-CACHE NEON SIGN TINTS ---
-    neon_tinted = []
-    if neon_sign_img:
-        for color in neon_flash_colors:
-            neon_tinted.append(get_tinted_surface(neon_sign_img, color))
-
-    # --- PRE-CACHE TITLE RENDERS ---
-    title_renders = []
-    for col in birthday_flash_colors:
-        l1 = font_brat_title.render("happy 30 birthday", True, col)
-        l2 = font_brat_title.render("anneliese", True, col)
-        title_renders.append((l1, l2))
-
-    # --- PRE-CREATE REUSABLE SURFACES ---
-    beam_surface = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT), pygame.SRCALPHA)
-    flash_surface = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT), pygame.SRCALPHA)
-    glitch_surface = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT), pygame.SRCALPHA)
-    pop_surface = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT))
-    pop_surface.fill(WHITE)
-    pop_surface.set_alpha(60)
-
-    # --- PRE-CACHE PARTICLE SURFACES ---
-    particle_cache = {}
-    for col in tile_id_colors:
-        for alpha in range(0, 256, 10):
-            p_surf = pygame.Surface((6, 6))
-            p_surf.fill(col)
-            p_surf.set_alpha(alpha)
-            particle_cache[(col, alpha)] = p_surf
-
-    # --- INIT GAME STATE ---
-    match_sounds = []
-    party_girl_5 = None
-    web_sounds = {}  # For JS Audio fallback on web
-
-    grid = [[Tile(r, c, random.randint(0, 3)) for c in range(GRID_SIZE)] for r in range(GRID_SIZE)]
-    while find_matches(grid):
-        grid = [[Tile(r, c, random.randint(0, 3)) for c in range(GRID_SIZE)] for r in range(GRID_SIZE)]
+    # --- ASSET LOADING (decoded on worker threads) ---
+    assets = AssetManager(Bundle.open(BUNDLE_PATH))
+    for name, spec in image_specs(SCREEN_WIDTH, TILE_SIZE).items():
+        assets.image(name, **spec)
 
-    light_colors = [(255, 255, 255, 60), (255, 20, 147, 80), (0, 191, 255, 80), (138, 43, 226, 80)]
-    current_light_color = light_colors[0]
+    audio = AudioManager(assets)
+
+    pacer = FramePacer(ambient_fps=ambient_fps)
 
-    # --- WAITING SCREEN ---
+    # --- WAITING SCREEN (doubles as the loading screen) ---
+    # The text never changes, so it is rendered once, and the screen is only
+    # redrawn when the progress bar moves or the window comes back.
+    title_surf = font_brat.render("happy 30th birthday annelliese", True, BLACK)
+    start_surf = font_small.render("click to play", True, BLACK)
+    shown = None
     waiting = True
     while waiting:
-        screen.fill(BRAT_GREEN)
-        title_surf = font_brat.render("happy 30th birthday annelliese", True, BLACK)
-        start_surf = font_small.render("click to play", True, BLACK)
-        screen.blit(title_surf, title_surf.get_rect(center=(SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2 - 40)))
-        screen.blit(start_surf, start_surf.get_rect(center=(SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2 + 50)))
-        pygame.display.flip()
+        loaded = assets.done
+        progress = assets.poll()
+        if assets.done and not loaded:
+            assets.report()
+        state = (assets.done, int(progress * 400))
+        if state != shown and not pacer.paused:
+            shown = state
+            screen.fill(BRAT_GREEN)
+            screen.blit(title_surf, title_surf.get_rect(center=(SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2 - 40)))
+            if assets.done:
+                screen.blit(start_surf, start_surf.get_rect(center=(SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2 + 50)))
+            else:
+                bar = pygame.Rect(0, 0, 400, 16)
+                bar.center = (SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2 + 50)
+                pygame.draw.rect(screen, BLACK, bar, 2)
+                pygame.draw.rect(screen, BLACK, (bar.x, bar.y, int(bar.w * progress), bar.h))
+            pygame.display.flip()
         for event in pygame.event.get():
+            pacer.handle_event(event)
             if event.type == pygame.QUIT:
                 pygame.quit()
                 return
-            if event.type == pygame.MOUSEBUTTONUP:
+            if event.type in (pygame.WINDOWEXPOSED, pygame.WINDOWFOCUSGAINED, pygame.WINDOWRESTORED):
+                shown = None
+            if event.type == pygame.MOUSEBUTTONUP and assets.done:
                 waiting = False
                 # Init audio after user gesture so browser allows AudioContext
-                try:
-                    pygame.mixer.music.load("assets/sounds/background_track.mp3")
-                    pygame.mixer.music.set_volume(0.3)
-                    pygame.mixer.music.play(-1)
-                except:
-                    pass
-                if IS_WEB:
-                    # Use JavaScript Audio API via eval - pygame.mixer.Sound is broken on web
-                    try:
-                        _platform.window.eval("""
-                            window._game_sounds = {};
-                            window._game_sounds.match_1 = new Audio("assets/sounds/party_girl_1.ogg");
-                            window._game_sounds.match_1.volume = 0.8;
-                            window._game_sounds.match_2 = new Audio("assets/sounds/party_girl_2.ogg");
-                            window._game_sounds.match_2.volume = 0.8;
-                            window._game_sounds.party_girl_5 = new Audio("assets/sounds/party_girl_5.ogg");
-                            window._game_sounds.party_girl_5.volume = 1.0;
-                        """)
-                        web_sounds["loaded"] = True
-                    except Exception as e:
-                        print(f"[AUDIO] JS Audio init failed: {e}")
-                else:
-                    for i in [1, 2]:
-                        try:
-                            s = pygame.mixer.Sound(f"assets/sounds/party_girl_{i}.mp3")
-                            s.set_volume(0.8)
-                            match_sounds.append(s)
-                        except:
-                            pass
-                    try:
-                        party_girl_5 = pygame.mixer.Sound("assets/sounds/party_girl_5.mp3")
-                        party_girl_5.set_volume(1.0)
-                    except:
-                        pass
-        await asyncio.sleep(0)
+                audio.start()
+        await pacer.wait(0 if pacer.paused else (pacer.ambient_fps if assets.done else pacer.active_fps))
 
     pygame.event.clear()
 
-    selected_tile = None
-    running = True
-    color_timer = 0
-    ball_angle = 0
-    glitch_timer, glitch_active, glitch_rects = 0, False, []
-    flash_timer, flash_active, current_lens = 0, False, (0, 0)
-    particles = []
-    lenses = [(110, 19, False), (75, 80, True), (125, 50, True), (168, 38, True), (215, 55, True), (270, 90, True), (180, -30, False), (240, 19, False)]
-    pap_x1, pap_y1 = 20, 150
-    pap_x2, pap_y2 = 20, 50
-    vip_x, vip_y = 80, 90
+    prof = FrameProfiler(csv_path=profile_csv, enabled=profile, phases=PROFILE_PHASES)
+    if profile:
+        prof.toggle()
+    font_prof = pygame.font.SysFont("Courier New, monospace", 16)
 
-    # --- MAIN GAME LOOP ---
-    while running:
-        stable = is_board_stable(grid)
-        if stable:
-            matches = find_matches(grid)
-            if matches:
-                if IS_WEB and web_sounds.get("loaded"):
-                    # Play via JS Audio on web
-                    try:
-                        if len(matches) >= 5:
-                            _platform.window.eval("window._game_sounds.party_girl_5.currentTime=0; window._game_sounds.party_girl_5.play();")
-                        else:
-                            pick = random.choice(["match_1", "match_2"])
-                            _platform.window.eval(f"window._game_sounds.{pick}.currentTime=0; window._game_sounds.{pick}.play();")
-                    except:
-                        pass
-                else:
-                    if len(matches) >= 5 and party_girl_5:
-                        try:
-                            party_girl_5.play()
-                        except:
-                            pass
-                    elif match_sounds:
-                        try:
-                            random.choice(match_sounds).play()
-                        except:
-                            pass
-                for r, c in matches:
-                    t = grid[r][c]
-                    if t:
-                        for _ in range(random.randint(4, 6)):
-                            particles.append({
-                                'x': BOARD_X + t.visual_x + TILE_SIZE // 2,
-                                'y': BOARD_Y + t.visual_y + TILE_SIZE // 2,
-                                'vx': random.uniform(-4, 4),
-                                'vy': random.uniform(-4, 4),
-                                'life': 25,
-                                'color': tile_id_colors[t.color_id % len(tile_id_colors)]
-                            })
-                    grid[r][c] = None
-                apply_gravity(grid)
-
-        glitch_timer += 1
-        if not glitch_active and random.random() < 0.05:
-            glitch_active, glitch_timer, glitch_rects = True, 0, []
-            for _ in range(random.randint(2, 6)):
-                g_col = random.choice(birthday_flash_colors) + (random.randint(40, 150),)
-                glitch_rects.append((random.randint(0, SCREEN_HEIGHT), random.randint(2, 195), g_col))
-        if glitch_active and glitch_timer > 7:
-            glitch_active = False
+    def draw_profiler(surface):
+        prof.draw_overlay(surface, font_prof)
 
+    if seed is None:
+        seed = random.randrange(2 ** 32)
+    seed &= SEED_MASK  # the replay header stores it as an unsigned 64-bit value
+    governor = QualityGovernor(pinned=quality)
+    game = Game(assets.images, on_match=audio.play_match, prof=prof, rng=random.Random(seed),
+                quality=governor.current)
+    comp = Compositor(screen, BRAT_GREEN)
+    recorder = InputRecorder(record_path, seed) if record_path else None
+
+    # --- MAIN GAME LOOP (fixed simulation tick, interpolated drawing) ---
+    running = True
+    tick = 0
+    accumulator = 0.0
+    last_time = time.perf_counter()
+    while running:
+        frame_start = time.perf_counter()
+        prof.begin_frame()
         for event in pygame.event.get():
+            pacer.handle_event(event)
             if event.type == pygame.QUIT:
                 running = False
-            if event.type == pygame.MOUSEBUTTONDOWN and stable:
-                mouse_x, mouse_y = pygame.mouse.get_pos()
-                if BOARD_X <= mouse_x <= BOARD_X + BOARD_WIDTH and BOARD_Y <= mouse_y <= BOARD_Y + BOARD_HEIGHT:
-                    col, row = (mouse_x - BOARD_X) // TILE_SIZE, (mouse_y - BOARD_Y) // TILE_SIZE
-                    if selected_tile is None:
-                        selected_tile = (row, col)
-                    else:
-                        r1, c1 = selected_tile
-                        r2, c2 = (row, col)
-                        if abs(r1 - r2) + abs(c1 - c2) == 1:
-                            grid[r1][c1], grid[r2][c2] = grid[r2][c2], grid[r1][c1]
-                            grid[r1][c1].row, grid[r1][c1].col = r1, c1
-                            grid[r2][c2].row, grid[r2][c2].col = r2, c2
-                            if not find_matches(grid):
-                                grid[r1][c1], grid[r2][c2] = grid[r2][c2], grid[r1][c1]
-                                grid[r1][c1].row, grid[r1][c1].col = r1, c1
-                                grid[r2][c2].row, grid[r2][c2].col = r2, c2
-                        selected_tile = None
-
-        screen.fill(BRAT_GREEN)
-        ball_angle += 1.5
-        color_timer += 1
-        if color_timer % 45 == 0:
-            current_light_color = random.choice(light_colors)
-
-        # --- LIGHT BEAMS (reuse surface) ---
-        beam_surface.fill((0, 0, 0, 0))
-        cx, cy = SCREEN_WIDTH // 2, 110
-        for i in range(8):
-            rad = math.radians(ball_angle + (i * 45))
-            cos_r, sin_r = math.cos(rad), math.sin(rad)
-            e1 = (cx + cos_r * 1500 - sin_r * 225, cy + sin_r * 1500 + cos_r * 225)
-            e2 = (cx + cos_r * 1500 + sin_r * 225, cy + sin_r * 1500 - cos_r * 225)
-            pygame.draw.polygon(beam_surface, current_light_color, [(cx, cy), e1, e2])
-            e1c = (cx + cos_r * 1500 - sin_r * 75, cy + sin_r * 1500 + cos_r * 75)
-            e2c = (cx + cos_r * 1500 + sin_r * 75, cy + sin_r * 1500 - cos_r * 75)
-            pygame.draw.polygon(beam_surface, (255, 255, 255, 120), [(cx, cy), e1c, e2c])
-        screen.blit(beam_surface, (0, 0))
-
-        # --- VIP & PAPARAZZI ---
-        if not flash_active and random.random() < 0.035:
-            flash_active, flash_timer = True, 0
-            choice = random.choice(lenses)
-            base_x = pap_x2 if choice[2] else pap_x1
-            base_y = pap_y2 if choice[2] else pap_y1
-            current_lens = (base_x + choice[0], base_y + choice[1])
-
-        if flash_active:
-            flash_surface.fill((0, 0, 0, 0))
-            radius = int(140 * (0.75 ** flash_timer))
-            if radius > 5:
-                pygame.draw.circle(flash_surface, (255, 255, 255, 160), current_lens, radius)
-            screen.blit(flash_surface, (0, 0))
-
-        if paparazzi_2_img:
-            screen.blit(paparazzi_2_img, (pap_x2, pap_y2))
-        if vip_photo:
-            screen.blit(vip_photo, (vip_x, vip_y))
-            if flash_active and flash_timer < 4:
-                glow = vip_photo.copy()
-                glow.fill((120, 120, 120), special_flags=pygame.BLEND_RGB_ADD)
-                screen.blit(glow, (vip_x, vip_y))
-
-        if paparazzi_img:
-            screen.blit(paparazzi_img, (pap_x1, pap_y1))
-
-        if flash_active:
-            if flash_timer < 2:
-                screen.blit(pop_surface, (0, 0))
-            flash_timer += 1
-            if flash_timer > 8:
-                flash_active = False
-
-        # --- TITLE (cached renders) ---
-        c_idx = (color_timer // 15) % len(title_renders)
-        l1, l2 = title_renders[c_idx]
-        screen.blit(l1, l1.get_rect(center=(SCREEN_WIDTH // 2, 180)))
-        screen.blit(l2, l2.get_rect(center=(SCREEN_WIDTH // 2, 250)))
-
-        # --- DISCO BALL ---
-        wobble = math.sin(ball_angle * 0.05) * 8
-        screen.blit(disco_ball_img, (SCREEN_WIDTH // 2 - 112 + wobble, 5))
-
-        # --- EXTRAS ---
-        if crowd_img:
-            screen.blit(crowd_img, (0, 780 + math.sin(ball_angle * 0.1) * 10))
-        if neon_tinted:
-            screen.blit(neon_tinted[(color_timer // 30) % len(neon_tinted)], (75, 450))
-        if booth_left:
-            screen.blit(booth_left, (20, 580))
-            if homer_img:
-                screen.blit(homer_img, (210, 580))
-            if pink_img:
-                screen.blit(pink_img, (160, 610))
-            if scooby_img:
-                screen.blit(scooby_img, (70, 540))
-        if mystery_machine_img:
-            mx, my = SCREEN_WIDTH - 300, 300
-            if addison_img:
-                bop = math.sin(color_timer * 0.1) * 10
-                screen.blit(addison_img, (mx + 60, my - 135 + bop))
-            screen.blit(mystery_machine_img, (mx, my))
-        if charli_img:
-            screen.blit(charli_img, (SCREEN_WIDTH - 270, SCREEN_HEIGHT - 450))
-
-        if glitch_active:
-            glitch_surface.fill((0, 0, 0, 0))
-            for g_y, g_h, g_col in glitch_rects:
-                pygame.draw.rect(glitch_surface, g_col, (0, g_y, SCREEN_WIDTH, g_h))
-            screen.blit(glitch_surface, (0, 0))
-
-        # --- GAME BOARD ---
-        strobe_val = (math.sin(color_timer * 0.4) + 1) / 2
-        strobe_color = (int(255 - strobe_val * 50), 255, int(255 - strobe_val * 50))
-
-        pygame.draw.rect(screen, BLACK, (BOARD_X - 5, BOARD_Y - 5, BOARD_WIDTH + 10, BOARD_HEIGHT + 10))
-        pygame.draw.rect(screen, strobe_color, (BOARD_X, BOARD_Y, BOARD_WIDTH, BOARD_HEIGHT))
-
-        for r in range(GRID_SIZE):
-            for c in range(GRID_SIZE):
-                t = grid[r][c]
-                if t:
-                    t.update()
-                    dx, dy = BOARD_X + t.visual_x, BOARD_Y + t.visual_y
-                    g_col = tile_id_colors[t.color_id % len(tile_id_colors)]
-                    pygame.draw.circle(screen, g_col, (dx + 35, dy + 35), 33)
-                    pygame.draw.circle(screen, BLACK, (dx + 35, dy + 35), 29, 2)
-                    if annie_photos:
-                        screen.blit(annie_photos[t.color_id % len(annie_photos)], (dx + 7, dy + 7))
-                    if selected_tile == (r, c):
-                        pygame.draw.rect(screen, BRAT_GREEN, (dx, dy, 70, 70), 4)
-
-        # --- PARTICLES (optimized) ---
-        alive = []
-        for p in particles:
-            p['x'] += p['vx']
-            p['y'] += p['vy']
-            p['life'] -= 1
-            if p['life'] > 0:
-                alpha = (p['life'] * 255 // 25) // 10 * 10
-                alpha = max(0, min(250, alpha))
-                key = (p['color'], alpha)
-                if key in particle_cache:
-                    screen.blit(particle_cache[key], (p['x'], p['y']))
-                alive.append(p)
-        particles = alive
-
-        pygame.display.flip()
-        await asyncio.sleep(0)
-        clock.tick(60)
+            elif event.type == pygame.KEYDOWN and event.key == pygame.K_F3:
+                prof.toggle()
+            elif event.type == pygame.KEYDOWN and event.key == pygame.K_F4:
+                # Cycle the pinned tier: high, medium, low, kiosk, then back to automatic.
+                pinned = governor.pinned
+                governor.pin(None if pinned == len(TIERS) - 1 else (0 if pinned is None else pinned + 1))
+                game.set_quality(governor.current)
+                print(f"[QUALITY] {governor.current.name} ({'pinned' if governor.pinned is not None else 'auto'})")
+            else:
+                if recorder:
+                    recorder.record(tick, event)
+                game.handle_event(event)
+        prof.mark("events")
+
+        # In the background nothing is simulated or drawn; the game resumes
+        # where it stopped instead of catching up on the time away.
+        if pacer.paused:
+            await pacer.wait(0)
+            last_time = time.perf_counter()
+            comp.invalidate()
+            continue
+
+        # Run as many ticks as the elapsed time calls for, so a slow frame
+        # drops frames rather than slowing the game down.
+        now = time.perf_counter()
+        accumulator = min(accumulator + now - last_time, MAX_CATCH_UP)
+        last_time = now
+        while accumulator >= TICK_SECONDS:
+            game.update()
+            accumulator -= TICK_SECONDS
+            tick += 1
+
+        game.draw(comp, accumulator / TICK_SECONDS)
+        if prof.overlay:
+            comp.draw("profiler", draw_profiler, ((10, 10), prof.overlay_size))
+        comp.present()
+        prof.mark("present")
+        audio.flush()
+        prof.mark("audio")
+        if governor.update(time.perf_counter() - frame_start):
+            game.set_quality(governor.current)
+        await pacer.wait(pacer.fps(game.animating))
+        prof.mark("wait")
+        prof.end_frame()
+
+    if recorder:
+        recorder.close(tick, zlib.crc32(game.board.cells))
+    prof.close()
+    pygame.quit()
 
+# ==========================================
+# 6. REPLAY
+# ==========================================
+def run_replay(path, headless=False, profile_csv=None, draw=True, quality=0):
+    """Play a recorded session back as fast as possible, with or without a window.
+
+    Every tick is drawn (at alpha 1) at the fixed quality tier `quality`
+    unless draw is False, in which case only the simulation runs.
+    """
+    if headless:
+        os.environ["SDL_VIDEODRIVER"] = "dummy"
+        os.environ["SDL_AUDIODRIVER"] = "dummy"
+    pygame.init()
+    screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
+    pygame.display.set_caption("Replay")
+    assets = AssetManager(Bundle.open(BUNDLE_PATH))
+    for name, spec in image_specs(SCREEN_WIDTH, TILE_SIZE).items():
+        assets.image(name, **spec)
+    images = assets.wait()
+
+    replay = Replay.load(path)
+    prof = FrameProfiler(csv_path=profile_csv, phases=PROFILE_PHASES)
+    game = Game(images, prof=prof, rng=random.Random(replay.seed), quality=TIERS[quality])
+    comp = Compositor(screen, BRAT_GREEN)
+
+    start = time.perf_counter()
+    ticks = 0
+    for tick in range(replay.ticks):
+        prof.begin_frame()
+        if pygame.event.peek(pygame.QUIT):
+            break
+        pygame.event.pump()
+        for event in replay.events_for(tick):
+            game.handle_event(event)
+        prof.mark("events")
+        game.update()
+        if draw:
+            game.draw(comp)
+            comp.present()
+            prof.mark("present")
+        prof.end_frame()
+        ticks += 1
+    elapsed = time.perf_counter() - start
+    prof.close()
+
+    print(f"[REPLAY] {ticks} ticks in {elapsed:.2f} s ({ticks / max(elapsed, 1e-9):.0f} per second)")
+    if ticks == replay.ticks and replay.board_crc and zlib.crc32(game.board.cells) != replay.board_crc:
+        print("[REPLAY] final board differs from the recording")
     pygame.quit()
 
+def cli_value(flag, default=None):
+    return sys.argv[sys.argv.index(flag) + 1] if flag in sys.argv else default
+
 if __name__ == "__main__":
-    asyncio.run(main())
+    seed, quality = cli_value("--seed"), cli_value("--quality")
+    try:
+        quality = tier_index(quality) if quality is not None else None
+    except ValueError as e:
+        sys.exit(f"[QUALITY] {e}")
+    if "--replay" in sys.argv:
+        run_replay(cli_value("--replay"), headless="--headless" in sys.argv, profile_csv=cli_value("--profile-csv"),
+                   draw="--no-draw" not in sys.argv, quality=quality or 0)
+        sys.exit(0)
+    asyncio.run(main(profile="--profile" in sys.argv, profile_csv=cli_value("--profile-csv"),
+                     seed=int(seed) if seed is not None else None, record_path=cli_value("--record"),
+                     quality=quality,
+                     ambient_fps=int(cli_value("--ambient-fps", AMBIENT_FPS))))
@@ -0,0 +1,80 @@
+import asyncio
+import sys
+import time
+
+import pygame
+
+IS_WEB = sys.platform == "emscripten"
+if IS_WEB:
+    import platform as _platform
+
+ACTIVE_FPS = 60      # while tiles, particles or the player are moving
+AMBIENT_FPS = 20     # when only the lights, beams and flashes are left
+PAUSED_FPS = 5       # event polling while the window or tab is in the background
+
+_HIDE_EVENTS = {pygame.WINDOWFOCUSLOST, pygame.WINDOWMINIMIZED, pygame.WINDOWHIDDEN}
+_SHOW_EVENTS = {pygame.WINDOWFOCUSGAINED, pygame.WINDOWRESTORED, pygame.WINDOWSHOWN}
+
+
+# ==========================================
+# 1. FRAME PACER
+# ==========================================
+class FramePacer:
+    """Picks how often the main loop renders, and waits out the rest of each frame.
+
+    fps(animating) is active_fps while something moves every tick,
+    ambient_fps when only ambient effects are left, and 0 while `paused`:
+    the window lost focus, was minimised or hidden, or the browser tab is
+    in the background. A paused loop skips updating and drawing and only
+    polls events at PAUSED_FPS.
+
+    wait(fps) ends a frame. On desktop Clock.tick sleeps in SDL. In the
+    browser pygbag runs the loop from requestAnimationFrame, so wait()
+    never blocks: at the active rate it yields with asyncio.sleep(0) to
+    take the next animation frame, and at the lower rates it sleeps for
+    the rest of the frame time to skip a few.
+    """
+
+    def __init__(self, active_fps=ACTIVE_FPS, ambient_fps=AMBIENT_FPS, paused_fps=PAUSED_FPS):
+        self.active_fps = active_fps
+        self.ambient_fps = min(ambient_fps, active_fps)
+        self.paused_fps = paused_fps
+        self.clock = pygame.time.Clock()
+        self.focused = True
+        self.last = time.perf_counter()
+
+    def handle_event(self, event):
+        if event.type in _HIDE_EVENTS:
+            self.focused = False
+        elif event.type in _SHOW_EVENTS:
+            self.focused = True
+
+    @property
+    def paused(self):
+        if not self.focused:
+            return True
+        if IS_WEB:
+            try:
+                return bool(_platform.window.document.hidden)
+            except Exception:
+                return False
+        return False
+
+    def fps(self, animating):
+        if self.paused:
+            return 0
+        return self.active_fps if animating else self.ambient_fps
+
+    async def wait(self, fps):
+        fps = fps or self.paused_fps
+        if IS_WEB:
+            if fps >= self.active_fps:
+                # Timing the sleep to land just before the next animation
+                # frame regularly misses it and halves the rate.
+                await asyncio.sleep(0)
+            else:
+                await asyncio.sleep(max(0.0, 1 / fps - (time.perf_counter() - self.last)))
+        else:
+            await asyncio.sleep(0)
+            self.clock.tick(fps)
+        self.last = time.perf_counter()
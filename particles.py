@@ -0,0 +1,93 @@
+from array import array
+
+from assets import LazyCache
+
+PARTICLE_LIFE = 25
+
+
+def particle_alpha(life, lifetime=PARTICLE_LIFE):
+    """Alpha bucket (multiple of 10) used for a particle with `life` frames left."""
+    return max(0, min(250, (life * 255 // lifetime) // 10 * 10))
+
+# ==========================================
+# 1. PARTICLE STORE
+# ==========================================
+class ParticleSystem:
+    """Fixed-capacity ring buffer of particles stored as parallel typed arrays.
+
+    Every particle lives exactly `lifetime` ticks and moves in a straight
+    line, so particles expire in the order they were emitted and a position
+    is just origin + velocity * age, with fractional ages between ticks.
+    Nothing is written per particle per tick; update() only advances the
+    clock and drops the expired tail.
+    """
+
+    __slots__ = ("capacity", "limit", "lifetime", "x", "y", "vx", "vy", "birth", "color",
+                 "head", "count", "frame", "sprites")
+
+    def __init__(self, capacity=16384, lifetime=PARTICLE_LIFE):
+        self.capacity = capacity
+        self.limit = capacity
+        self.lifetime = lifetime
+        self.x = array("f", bytes(4 * capacity))
+        self.y = array("f", bytes(4 * capacity))
+        self.vx = array("f", bytes(4 * capacity))
+        self.vy = array("f", bytes(4 * capacity))
+        self.birth = array("l", [0]) * capacity
+        self.color = array("B", bytes(capacity))
+        self.head = 0
+        self.count = 0
+        self.frame = 0
+        self.sprites = []
+
+    def bake(self, colors, cache):
+        """Index the (color, alpha) sprite cache by color index and age, per color on first use."""
+        lifetime = self.lifetime
+        self.sprites = LazyCache(lambda c: [cache[(colors[c], particle_alpha(lifetime - age, lifetime))]
+                                            for age in range(lifetime)])
+
+    def emit(self, x, y, vx, vy, color_index):
+        """Add a particle; dropped while `limit` particles are already alive."""
+        if self.count >= self.limit:
+            return
+        i = self.head
+        self.x[i], self.y[i] = x, y
+        self.vx[i], self.vy[i] = vx, vy
+        self.birth[i] = self.frame
+        self.color[i] = color_index
+        self.head = (i + 1) % self.capacity
+        self.count += 1
+
+    def clear(self):
+        self.count = 0
+
+    def update(self):
+        self.frame += 1
+        oldest = self.frame - self.lifetime + 1
+        birth, cap = self.birth, self.capacity
+        tail = (self.head - self.count) % cap
+        while self.count and birth[tail] < oldest:
+            tail = (tail + 1) % cap
+            self.count -= 1
+
+    def _segments(self):
+        tail = (self.head - self.count) % self.capacity
+        end = tail + self.count
+        if end <= self.capacity:
+            return ((tail, end),)
+        return ((tail, self.capacity), (0, end - self.capacity))
+
+    def draw(self, surface, alpha=1.0):
+        """Blit every live particle `alpha` of the way from the previous tick to the current one."""
+        frame, sprites = self.frame, self.sprites
+        t = frame - 1 + alpha
+        batch = []
+        for start, end in self._segments():
+            batch += [(sprites[c][frame - b], (x + vx * (t - b), y + vy * (t - b)))
+                      for x, y, vx, vy, b, c in zip(self.x[start:end], self.y[start:end],
+                                                    self.vx[start:end], self.vy[start:end],
+                                                    self.birth[start:end], self.color[start:end])]
+        if hasattr(surface, "fblits"):
+            surface.fblits(batch)
+        else:
+            surface.blits(batch, doreturn=False)
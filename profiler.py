@@ -0,0 +1,118 @@
+import csv
+from collections import deque
+from time import perf_counter_ns
+
+import pygame
+
+
+# ==========================================
+# 1. FRAME PROFILER
+# ==========================================
+class FrameProfiler:
+    """Times named phases of each frame with perf_counter_ns.
+
+    Call begin_frame(), then mark(name) at the end of every phase, then
+    end_frame(). Rolling p50/p95/p99 per phase are kept over the last
+    `window` frames and every frame can be appended to a CSV file. The CSV
+    columns are `phases` (plus total), so list every phase up front: a
+    frame that skips one writes 0, and a phase not listed is left out of
+    the file with a warning. While disabled each call is a single
+    attribute check.
+    """
+
+    def __init__(self, window=240, csv_path=None, enabled=False, phases=()):
+        self.window = window
+        self.enabled = enabled or csv_path is not None
+        self.overlay = False
+        self.samples = {}
+        self.order = [name for name in phases if name != "total"] + ["total"]
+        self.frame = {}
+        self.frame_no = 0
+        self.last = 0
+        self.frame_start = 0
+        self.csv_file = open(csv_path, "w", newline="") if csv_path else None
+        self.csv_writer = None
+        self.csv_fields = [f"{name}_ns" for name in self.order]
+        self._overlay_surf = None
+
+    def toggle(self):
+        """Flip profiling and the on-screen overlay together."""
+        self.overlay = not self.overlay
+        self.enabled = self.overlay or self.csv_file is not None
+        self._overlay_surf = None
+
+    def begin_frame(self):
+        if not self.enabled:
+            return
+        self.frame = {}
+        self.frame_start = self.last = perf_counter_ns()
+
+    def mark(self, name):
+        if not self.enabled:
+            return
+        now = perf_counter_ns()
+        self.frame[name] = self.frame.get(name, 0) + now - self.last
+        self.last = now
+
+    def end_frame(self):
+        if not self.enabled or not self.frame_start:
+            return
+        total = perf_counter_ns() - self.frame_start
+        self.frame["total"] = total
+        for name, ns in self.frame.items():
+            series = self.samples.get(name)
+            if series is None:
+                series = self.samples[name] = deque(maxlen=self.window)
+                if name not in self.order:
+                    self.order.insert(-1, name)
+                    if self.csv_file:
+                        print(f"[PROFILE] phase {name!r} was not declared and is not written to the CSV")
+            series.append(ns)
+        if self.csv_file:
+            if self.csv_writer is None:
+                self.csv_writer = csv.DictWriter(self.csv_file, ["frame"] + self.csv_fields,
+                                                 restval=0, extrasaction="ignore")
+                self.csv_writer.writeheader()
+            row = {f"{name}_ns": ns for name, ns in self.frame.items()}
+            row["frame"] = self.frame_no
+            self.csv_writer.writerow(row)
+        self.frame_no += 1
+        self.frame_start = 0
+
+    def percentiles(self, name, points=(50, 95, 99)):
+        """Rolling percentiles for a phase, in milliseconds."""
+        series = sorted(self.samples.get(name, ()))
+        if not series:
+            return tuple(0.0 for _ in points)
+        last = len(series) - 1
+        return tuple(series[min(last, last * p // 100)] / 1e6 for p in points)
+
+    def draw_overlay(self, surface, font, pos=(10, 10), refresh=30):
+        """Blit the percentile table; the text is only re-rendered every `refresh` frames."""
+        if not self.overlay:
+            return None
+        if self._overlay_surf is None or self.frame_no % refresh == 0:
+            lines = ["phase          p50    p95    p99 ms"]
+            for name in self.order:
+                p50, p95, p99 = self.percentiles(name)
+                lines.append(f"{name:<12} {p50:6.2f} {p95:6.2f} {p99:6.2f}")
+            renders = [font.render(line, True, (255, 255, 255)) for line in lines]
+            width = max(r.get_width() for r in renders) + 12
+            height = sum(r.get_height() for r in renders) + 12
+            panel = pygame.Surface((width, height), pygame.SRCALPHA)
+            panel.fill((0, 0, 0, 180))
+            y = 6
+            for r in renders:
+                panel.blit(r, (6, y))
+                y += r.get_height()
+            self._overlay_surf = panel
+        return surface.blit(self._overlay_surf, pos)
+
+    @property
+    def overlay_size(self):
+        return self._overlay_surf.get_size() if self._overlay_surf else (420, 320)
+
+    def close(self):
+        if self.csv_file:
+            self.csv_file.close()
+            self.csv_file = None
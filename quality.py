@@ -0,0 +1,90 @@
+from collections import deque, namedtuple
+
+QualityTier = namedtuple("QualityTier", "name beams beam_step max_particles cheap_glitch pop sway")
+
+# Ordered best to cheapest. The beams cover the whole window and the crowd
+# sways, so every tier but kiosk repaints the full window each frame; only
+# kiosk's frames mostly go out as partial updates.
+TIERS = [
+    QualityTier("high", beams=8, beam_step=1.5, max_particles=16384, cheap_glitch=False, pop=True, sway=True),
+    QualityTier("medium", beams=6, beam_step=6.0, max_particles=1024, cheap_glitch=True, pop=False, sway=True),
+    QualityTier("low", beams=4, beam_step=6.0, max_particles=256, cheap_glitch=True, pop=False, sway=True),
+    QualityTier("kiosk", beams=0, beam_step=0.0, max_particles=256, cheap_glitch=True, pop=False, sway=False),
+]
+
+
+def tier_index(name):
+    """Index of the tier called `name` (or given as a number); ValueError lists the valid ones."""
+    for i, tier in enumerate(TIERS):
+        if tier.name == name:
+            return i
+    try:
+        index = int(name)
+    except (TypeError, ValueError):
+        index = -1
+    if not 0 <= index < len(TIERS):
+        names = ", ".join(tier.name for tier in TIERS)
+        raise ValueError(f"unknown quality tier {name!r} (choose from {names} or 0-{len(TIERS) - 1})")
+    return index
+
+# ==========================================
+# 1. QUALITY GOVERNOR
+# ==========================================
+class QualityGovernor:
+    """Moves between TIERS to keep frame work inside the frame budget.
+
+    Feed update() the time each frame spent working (everything but the
+    frame-rate wait). Once a full window has been collected, the 90th
+    percentile is compared with the budget: above `downgrade_at` drops a
+    tier, below `upgrade_at` climbs one. After a change the window is
+    cleared and nothing moves for a cooldown, which is longer after a
+    downgrade so a tier that was just too slow isn't retried straight away.
+    A pinned tier never changes.
+    """
+
+    def __init__(self, budget=1 / 60, tier=0, pinned=None, window=60,
+                 downgrade_at=0.9, upgrade_at=0.5, down_cooldown=300, up_cooldown=60):
+        self.budget = budget
+        self.tier = tier if pinned is None else pinned
+        self.pinned = pinned
+        self.samples = deque(maxlen=window)
+        self.downgrade_at = downgrade_at
+        self.upgrade_at = upgrade_at
+        self.down_cooldown = down_cooldown
+        self.up_cooldown = up_cooldown
+        self.cooldown = 0
+
+    @property
+    def current(self):
+        return TIERS[self.tier]
+
+    def pin(self, tier):
+        """Hold `tier` (an index) until pin(None)."""
+        self.pinned = tier
+        if tier is not None:
+            self.tier = tier
+        self.samples.clear()
+
+    def update(self, frame_seconds):
+        """Record one frame; returns True when the tier changed."""
+        if self.pinned is not None:
+            return False
+        if self.cooldown:
+            self.cooldown -= 1
+            return False
+        self.samples.append(frame_seconds)
+        if len(self.samples) < self.samples.maxlen:
+            return False
+        ordered = sorted(self.samples)
+        load = ordered[len(ordered) * 9 // 10] / self.budget
+        if load > self.downgrade_at and self.tier < len(TIERS) - 1:
+            self.tier += 1
+            self.cooldown = self.down_cooldown
+        elif load < self.upgrade_at and self.tier > 0:
+            self.tier -= 1
+            self.cooldown = self.up_cooldown
+        else:
+            return False
+        self.samples.clear()
+        print(f"[QUALITY] {self.current.name} (p90 frame {load * self.budget * 1000:.1f} ms)")
+        return True
@@ -0,0 +1,295 @@
+import math
+from collections import OrderedDict
+
+import pygame
+
+# ==========================================
+# 1. LAYERED COMPOSITOR
+# ==========================================
+class StaticLayer:
+    """Several never-changing sprites pre-composited into one cropped surface."""
+
+    __slots__ = ("surface", "pos")
+
+    def __init__(self, blits):
+        blits = [(surf, pos) for surf, pos in blits if surf]
+        bounds = pygame.Rect(blits[0][1], blits[0][0].get_size()) if blits else pygame.Rect(0, 0, 0, 0)
+        for surf, pos in blits:
+            bounds.union_ip(pygame.Rect(pos, surf.get_size()))
+        self.surface = pygame.Surface(bounds.size, pygame.SRCALPHA)
+        for surf, (x, y) in blits:
+            self.surface.blit(surf, (x - bounds.x, y - bounds.y))
+        self.pos = bounds.topleft
+
+
+class Compositor:
+    """Retained display list that repaints and pushes only what changed.
+
+    A frame is an ordered list of uniquely tagged entries: blits, fills,
+    static layers or draw callbacks. present() diffs each entry against
+    last frame's entry with the same tag, replays the entries overlapping
+    each changed rect clipped to it, and passes the rects to
+    pygame.display.update(). When the dirty area covers most of the
+    window, as it does whenever a full-screen entry changes, the frame is
+    repainted in full and flipped instead.
+    """
+
+    def __init__(self, screen, background_color, full_threshold=0.6, max_rects=24):
+        self.screen = screen
+        self.background_color = background_color
+        self.full_threshold = full_threshold
+        self.max_rects = max_rects
+        self.screen_rect = screen.get_rect()
+        self.entries = []
+        self.previous = {}
+        self.force_full = True
+        self.last_dirty = []
+
+    def invalidate(self):
+        self.force_full = True
+
+    def begin(self):
+        self.entries = []
+
+    def blit(self, tag, surf, pos, changing=False):
+        """Queue a blit; pass changing=True if surf is redrawn in place between frames."""
+        rect = pygame.Rect(int(pos[0]), int(pos[1]), *surf.get_size())
+        self.entries.append((tag, 0, surf, pos, rect, None if changing else (surf, pos)))
+
+    def fill(self, tag, color, rect):
+        rect = pygame.Rect(rect)
+        self.entries.append((tag, 1, color, rect, rect, (color, tuple(rect))))
+
+    def layer(self, tag, layer):
+        self.blit(tag, layer.surface, layer.pos)
+
+    def draw(self, tag, fn, rect, key=None):
+        """Queue fn(surface); key=None means the entry is repainted every frame."""
+        rect = pygame.Rect(rect)
+        self.entries.append((tag, 2, fn, None, rect, key))
+
+    def _replay(self, clip=None):
+        screen = self.screen
+        screen.set_clip(clip)
+        screen.fill(self.background_color)
+        for entry in self.entries:
+            if clip is not None and not clip.colliderect(entry[4]):
+                continue
+            kind = entry[1]
+            if kind == 0:
+                screen.blit(entry[2], entry[3])
+            elif kind == 1:
+                screen.fill(entry[2], entry[3])
+            else:
+                entry[2](screen)
+        screen.set_clip(None)
+
+    def _dirty_rects(self):
+        previous = self.previous
+        current = {}
+        dirty = []
+        for entry in self.entries:
+            tag, rect, key = entry[0], entry[4], entry[5]
+            current[tag] = (rect, key)
+            old = previous.get(tag)
+            if old is None:
+                dirty.append(rect)
+            elif key is None or old[1] != key or old[0] != rect:
+                dirty.append(rect)
+                dirty.append(old[0])
+        for tag, (rect, _) in previous.items():
+            if tag not in current:
+                dirty.append(rect)
+        self.previous = current
+
+        merged = []
+        for rect in dirty:
+            rect = rect.inflate(2, 2).clip(self.screen_rect)
+            if not rect.w or not rect.h:
+                continue
+            hit = rect.collidelist(merged)
+            while hit != -1:
+                rect.union_ip(merged.pop(hit))
+                hit = rect.collidelist(merged)
+            merged.append(rect)
+        return merged
+
+    def present(self):
+        """Paint the queued frame and push it to the display. Returns the rects pushed."""
+        dirty = self._dirty_rects()
+        area = sum(r.w * r.h for r in dirty)
+        full_area = self.screen_rect.w * self.screen_rect.h
+        if self.force_full or len(dirty) > self.max_rects or area >= full_area * self.full_threshold:
+            self.force_full = False
+            self._replay()
+            pygame.display.flip()
+            self.last_dirty = [self.screen_rect]
+        else:
+            for rect in dirty:
+                self._replay(rect)
+            if dirty:
+                pygame.display.update(dirty)
+            self.last_dirty = dirty
+        return self.last_dirty
+
+
+# ==========================================
+# 2. TILE SPRITE ATLAS
+# ==========================================
+class TileAtlas:
+    """All tile faces baked once into a single surface.
+
+    Row 0 holds the normal face of every color id, row 1 the selected face.
+    sprites[color_id][selected] are subsurfaces into the shared atlas.
+    """
+
+    def __init__(self, colors, photos, tile_size, ring_color, highlight_color):
+        n = max(len(colors), len(photos), 1)
+        self.tile_size = tile_size
+        self.surface = pygame.Surface((n * tile_size, 2 * tile_size), pygame.SRCALPHA)
+        half = tile_size // 2
+        self.sprites = []
+        for color_id in range(n):
+            faces = []
+            for selected in (0, 1):
+                rect = pygame.Rect(color_id * tile_size, selected * tile_size, tile_size, tile_size)
+                face = self.surface.subsurface(rect)
+                pygame.draw.circle(face, colors[color_id % len(colors)], (half, half), half - 2)
+                pygame.draw.circle(face, ring_color, (half, half), half - 6, 2)
+                if photos:
+                    face.blit(photos[color_id % len(photos)], (7, 7))
+                if selected:
+                    pygame.draw.rect(face, highlight_color, (0, 0, tile_size, tile_size), 4)
+                faces.append(face)
+            self.sprites.append(faces)
+
+    def draw(self, surface, tiles, origin, selected=None, alpha=1.0):
+        """Draw an iterable of tiles with one batched blit call.
+
+        Tiles are placed `alpha` of the way from (prev_x, prev_y) to
+        (visual_x, visual_y).
+        """
+        ox, oy = origin
+        sprites, count = self.sprites, len(self.sprites)
+        if alpha >= 1.0:
+            batch = [(sprites[t.color_id % count][(t.row, t.col) == selected], (ox + t.visual_x, oy + t.visual_y))
+                     for t in tiles if t]
+        else:
+            batch = [(sprites[t.color_id % count][(t.row, t.col) == selected],
+                      (ox + t.prev_x + (t.visual_x - t.prev_x) * alpha, oy + t.prev_y + (t.visual_y - t.prev_y) * alpha))
+                     for t in tiles if t]
+        if hasattr(surface, "fblits"):
+            surface.fblits(batch)
+        else:
+            surface.blits(batch, doreturn=False)
+
+
+# ==========================================
+# 3. DISCO BEAM FRAME CACHE
+# ==========================================
+class BeamCache:
+    """Pre-rendered rotating light-beam frames.
+
+    The beam fan is symmetric every 360 / beams degrees, so with a fixed
+    angular step there are only a handful of distinct frames per color.
+    Frames are rendered lazily the first time a (color, step) pair is shown
+    and RLE-encoded, which keeps only their covered pixels at about the
+    same blit cost, so playback is always a single blit. Cached frames are
+    capped at `max_bytes`, least recently used first out. Encoding a frame
+    costs far more than drawing it, so when every step of `colors` colors
+    can't fit under the cap the frames are drawn into one reused surface
+    instead of being cached.
+    """
+
+    CORE_COLOR = (255, 255, 255, 120)
+
+    def __init__(self, size, center, beams=8, step=1.5, colors=4, max_bytes=64 << 20,
+                 length=1500, width=225, core_width=75):
+        self.size = size
+        self.center = center
+        self.beams = beams
+        self.step = step
+        self.period = 360 / beams
+        self.steps = max(1, round(self.period / step))
+        self.colors = colors
+        self.max_bytes = max_bytes
+        self.length, self.width, self.core_width = length, width, core_width
+        self.frames = OrderedDict()
+        self.bytes = 0
+        self.caching = None
+        self.scratch, self.scratch_key = None, None
+
+    def step_index(self, angle):
+        return int(round((angle % self.period) / self.step)) % self.steps
+
+    def _render(self, color, index, surf=None):
+        if surf is None:
+            surf = pygame.Surface(self.size, pygame.SRCALPHA)
+        else:
+            surf.fill((0, 0, 0, 0))
+        cx, cy = self.center
+        for i in range(self.beams):
+            rad = math.radians(index * self.step + i * self.period)
+            cos_r, sin_r = math.cos(rad), math.sin(rad)
+            tip_x, tip_y = cx + cos_r * self.length, cy + sin_r * self.length
+            for fill, width in ((color, self.width), (self.CORE_COLOR, self.core_width)):
+                pygame.draw.polygon(surf, fill, [(cx, cy), (tip_x - sin_r * width, tip_y + cos_r * width),
+                                                 (tip_x + sin_r * width, tip_y - cos_r * width)])
+        return surf
+
+    def frame(self, color, angle):
+        """Return the full-size beam surface for `color` at rotation `angle` (degrees)."""
+        key = (color, self.step_index(angle))
+        entry = self.frames.get(key)
+        if entry is not None:
+            self.frames.move_to_end(key)
+            return entry[0]
+        if self.caching is False:
+            if key != self.scratch_key:
+                self._render(color, key[1], self.scratch)
+                self.scratch_key = key
+            return self.scratch
+        surf = self._render(color, key[1])
+        size = pygame.mask.from_surface(surf, 0).count() * 4  # RLE keeps 4 bytes per covered pixel
+        if self.caching is None:
+            self.caching = size * self.steps * self.colors <= self.max_bytes
+            if not self.caching:
+                self.scratch, self.scratch_key = surf, key
+                return surf
+        surf.set_alpha(255, pygame.RLEACCEL)
+        self.frames[key] = (surf, size)
+        self.bytes += size
+        while self.bytes > self.max_bytes and len(self.frames) > 1:
+            self.bytes -= self.frames.popitem(last=False)[1][1]
+        return surf
+
+
+# ==========================================
+# 4. EFFECT SPRITES
+# ==========================================
+class FlashDiscs:
+    """The paparazzi flash disc for every step of its decay, rendered once.
+
+    Step n has radius int(start_radius * decay ** n); get(n) returns None
+    once the disc would be min_radius or smaller.
+    """
+
+    def __init__(self, start_radius=140, decay=0.75, min_radius=5, color=(255, 255, 255, 160)):
+        self.discs = []
+        while True:
+            radius = int(start_radius * decay ** len(self.discs))
+            if radius <= min_radius:
+                break
+            disc = pygame.Surface((radius * 2, radius * 2), pygame.SRCALPHA)
+            pygame.draw.circle(disc, color, (radius, radius), radius)
+            self.discs.append(disc)
+
+    def get(self, step):
+        return self.discs[step] if step < len(self.discs) else None
+
+def glitch_band(width, height, color):
+    """Strip for one glitch band: color is (r, g, b, a), applied as surface alpha."""
+    band = pygame.Surface((width, height))
+    band.fill(color[:3])
+    band.set_alpha(color[3])
+    return band
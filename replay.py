@@ -0,0 +1,69 @@
+import struct
+
+import pygame
+
+REPLAY_MAGIC = b"RPLAY1\0\0"
+HEADER = struct.Struct("<QII")   # seed, tick count, crc32 of the final board
+SEED_MASK = (1 << 64) - 1
+RECORD = struct.Struct("<IHBhh")  # tick, event type, button, x, y
+RECORDED_EVENTS = (pygame.MOUSEBUTTONDOWN, pygame.MOUSEBUTTONUP)
+
+
+# ==========================================
+# 1. INPUT RECORDER
+# ==========================================
+class InputRecorder:
+    """Appends the player's mouse button events, tagged with the simulation tick they precede.
+
+    Together with the RNG seed that is everything a Game needs to play the
+    session back tick-for-tick. The tick count and a checksum of the final
+    board are patched into the header on close().
+    """
+
+    def __init__(self, path, seed):
+        self.path = path
+        self.seed = seed
+        self.count = 0
+        self.file = open(path, "wb")
+        self.file.write(REPLAY_MAGIC)
+        self.file.write(HEADER.pack(seed, 0, 0))
+
+    def record(self, tick, event):
+        if event.type not in RECORDED_EVENTS:
+            return
+        x, y = event.pos
+        self.file.write(RECORD.pack(tick, event.type, event.button, x, y))
+        self.count += 1
+
+    def close(self, ticks, board_crc=0):
+        self.file.seek(len(REPLAY_MAGIC))
+        self.file.write(HEADER.pack(self.seed, ticks, board_crc))
+        self.file.close()
+        print(f"[REPLAY] recorded {self.count} inputs over {ticks} ticks (seed {self.seed}) to {self.path}")
+
+# ==========================================
+# 2. REPLAY FILE
+# ==========================================
+class Replay:
+    """A recorded session: seed, length in ticks, final board checksum and events by tick."""
+
+    def __init__(self, seed, ticks, board_crc, events):
+        self.seed = seed
+        self.ticks = ticks
+        self.board_crc = board_crc
+        self.events = events
+
+    @classmethod
+    def load(cls, path):
+        with open(path, "rb") as f:
+            data = f.read()
+        if not data.startswith(REPLAY_MAGIC):
+            raise ValueError(f"{path} is not a replay file")
+        seed, ticks, board_crc = HEADER.unpack_from(data, len(REPLAY_MAGIC))
+        events = {}
+        for tick, kind, button, x, y in RECORD.iter_unpack(data[len(REPLAY_MAGIC) + HEADER.size:]):
+            events.setdefault(tick, []).append(pygame.event.Event(kind, pos=(x, y), button=button))
+        return cls(seed, ticks, board_crc, events)
+
+    def events_for(self, tick):
+        return self.events.get(tick, ())
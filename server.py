@@ -0,0 +1,272 @@
+import argparse
+import asyncio
+import heapq
+import json
+import random
+import sys
+
+from board import Board, MoveIndex
+from solver import CASCADE_BONUS
+
+BATCH_DELAY = 0.005        # seconds inputs wait so a burst is applied and answered in one go
+LEADERBOARD_INTERVAL = 1.0
+
+
+def encode(msg):
+    return (json.dumps(msg, separators=(",", ":")) + "\n").encode()
+
+# ==========================================
+# 1. SESSION
+# ==========================================
+class Session:
+    """One guest's board: its own Board, seeded RNG, move index and score.
+
+    Cascades resolve instantly on the server; clients animate the diffs.
+    """
+
+    __slots__ = ("id", "name", "seed", "board", "index", "score", "moves", "pending", "ack", "send")
+
+    def __init__(self, session_id, name, seed, send, size=8, num_colors=4):
+        self.id = session_id
+        self.name = name
+        self.seed = seed
+        self.board = Board(size, num_colors=num_colors, rng=random.Random(seed))
+        self.board.fill()
+        self.index = MoveIndex(self.board)
+        self.score = 0
+        self.moves = 0
+        self.pending = []
+        self.ack = 0
+        self.send = send
+
+    def snapshot(self):
+        board = self.board
+        return {"t": "state", "id": self.id, "rows": board.rows, "cols": board.cols,
+                "cells": list(board.cells), "score": self.score}
+
+    def apply_pending(self):
+        """Play every queued swap and return the diff message (None if nothing was queued)."""
+        if not self.pending:
+            return None
+        board, index = self.board, self.index
+        before = bytes(board.cells)
+        cleared_total = rejected = 0
+        for seq, move in self.pending:
+            self.ack = max(self.ack, seq)
+            if not index.is_legal(*move):
+                rejected += 1
+                continue
+            board.swap(*move)
+            cascades, cleared = board.resolve()
+            self.score += cleared + CASCADE_BONUS * max(0, cascades - 1)
+            self.moves += 1
+            cleared_total += cleared
+            if not index.has_move():
+                board.shuffle()
+                index.rebuild()
+        self.pending.clear()
+        after = board.cells
+        changes = [[i, c] for i, (b, c) in enumerate(zip(before, after)) if b != c]
+        return {"t": "diff", "ack": self.ack, "cells": changes, "score": self.score,
+                "cleared": cleared_total, "rejected": rejected}
+
+# ==========================================
+# 2. GAME HOST
+# ==========================================
+class GameHost:
+    """Runs many independent sessions on one asyncio loop.
+
+    Transports call join()/leave() and hand every parsed message to
+    submit(). Swaps are only queued; a flush scheduled BATCH_DELAY later
+    applies everything queued across all sessions and sends each session
+    a single diff of the cells that changed. The leaderboard is rebuilt
+    and broadcast at most once per LEADERBOARD_INTERVAL, and only when a
+    score moved.
+    """
+
+    def __init__(self, seed=0, size=8, num_colors=4, batch_delay=BATCH_DELAY, leaderboard_size=10):
+        self.seed = seed
+        self.size = size
+        self.num_colors = num_colors
+        self.batch_delay = batch_delay
+        self.leaderboard_size = leaderboard_size
+        self.sessions = {}
+        self.next_id = 1
+        self.dirty = set()
+        self.flush_handle = None
+        self.scores_changed = False
+        self.leaders = []
+
+    def join(self, name, send, seed=None):
+        session_id = self.next_id
+        self.next_id += 1
+        seed = self.seed * 1000003 + session_id if seed is None else seed
+        session = Session(session_id, name or f"guest{session_id}", seed, send, self.size, self.num_colors)
+        self.sessions[session_id] = session
+        send(session.snapshot())
+        if self.leaders:
+            send({"t": "leaders", "top": self.leaders})
+        return session
+
+    def leave(self, session):
+        self.sessions.pop(session.id, None)
+        self.dirty.discard(session)
+        self.scores_changed = True
+
+    def submit(self, session, msg):
+        """Queue one client message; raises ValueError/KeyError/TypeError if it is malformed."""
+        if not isinstance(msg, dict):
+            raise TypeError("message is not an object")
+        kind = msg.get("t")
+        if kind == "swap":
+            r1, c1, r2, c2 = (int(v) for v in msg["m"])
+            seq = msg.get("seq")
+            if not isinstance(seq, int) or isinstance(seq, bool):
+                raise TypeError("seq is not an integer")
+            session.pending.append((seq, (r1, c1, r2, c2)))
+            self.dirty.add(session)
+            if self.flush_handle is None:
+                self.flush_handle = asyncio.get_running_loop().call_later(self.batch_delay, self.flush)
+        elif kind == "state":
+            session.send(session.snapshot())
+        elif kind == "leaders":
+            session.send({"t": "leaders", "top": self.leaders})
+
+    def flush(self):
+        self.flush_handle = None
+        dirty, self.dirty = self.dirty, set()
+        for session in dirty:
+            diff = session.apply_pending()
+            if diff:
+                session.send(diff)
+                self.scores_changed = True
+
+    def leaderboard(self):
+        top = heapq.nlargest(self.leaderboard_size, self.sessions.values(), key=lambda s: s.score)
+        return [[s.name, s.score] for s in top]
+
+    async def broadcast_leaders(self, interval=LEADERBOARD_INTERVAL):
+        while True:
+            await asyncio.sleep(interval)
+            if not self.scores_changed:
+                continue
+            self.scores_changed = False
+            leaders = self.leaderboard()
+            if leaders == self.leaders:
+                continue
+            self.leaders = leaders
+            msg = {"t": "leaders", "top": leaders}
+            for session in self.sessions.values():
+                session.send(msg)
+
+# ==========================================
+# 3. TRANSPORTS (line-delimited JSON)
+# ==========================================
+async def join_client(host, reader, send):
+    """Read the join line and start the session; None if the client left first."""
+    line = await reader.readline()
+    if not line:
+        return None
+    hello = json.loads(line)
+    if not isinstance(hello, dict):
+        raise ValueError("join is not an object")
+    name = hello.get("name")
+    return host.join(name[:32] if isinstance(name, str) else None, send)
+
+async def handle_client(host, reader, writer):
+    """One TCP connection: the first line must be {"t": "join", "name": ...}.
+
+    The server picks every seed; a guest can't choose their own board for
+    the shared leaderboard.
+    """
+    send = lambda msg: writer.write(encode(msg))
+    try:
+        session = await join_client(host, reader, send)
+    except ConnectionError:
+        session = None
+    except ValueError as e:
+        print(f"[SERVER] dropping client: bad join: {e}", file=sys.stderr)
+        session = None
+    if session is None:
+        writer.close()
+        return
+    try:
+        while True:
+            line = await reader.readline()
+            if not line:
+                break
+            try:
+                host.submit(session, json.loads(line))
+            except (ValueError, KeyError, TypeError) as e:
+                print(f"[SERVER] session {session.id}: bad message: {e}", file=sys.stderr)
+            if writer.transport.get_write_buffer_size() > 1 << 16:
+                await writer.drain()
+    except ConnectionError:
+        pass
+    except ValueError as e:  # readline() got a line longer than the stream limit
+        print(f"[SERVER] session {session.id}: dropping client: {e}", file=sys.stderr)
+    finally:
+        host.leave(session)
+        writer.close()
+
+async def serve_tcp(host, address="127.0.0.1", port=8765):
+    server = await asyncio.start_server(lambda r, w: handle_client(host, r, w), address, port)
+    print(f"[SERVER] listening on {address}:{server.sockets[0].getsockname()[1]}", file=sys.stderr, flush=True)
+    asyncio.create_task(host.broadcast_leaders())
+    async with server:
+        await server.serve_forever()
+
+def render_board(board):
+    return "\n".join(" ".join("." if v is None else str(v) for v in row) for row in board.to_rows())
+
+async def serve_stdin(host):
+    """Local harness: one session driven by typed lines.
+
+    Type a swap as "r1 c1 r2 c2", or any JSON message. Replies are printed
+    as JSON lines followed by the board.
+    """
+    loop = asyncio.get_running_loop()
+    asyncio.create_task(host.broadcast_leaders())
+    session = host.join("local", lambda msg: print(json.dumps(msg, separators=(",", ":")), flush=True))
+    print(render_board(session.board), flush=True)
+    seq = 0
+    while True:
+        line = await loop.run_in_executor(None, sys.stdin.readline)
+        if not line:
+            break
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            if line.startswith("{"):
+                msg = json.loads(line)
+            else:
+                seq += 1
+                msg = {"t": "swap", "seq": seq, "m": [int(v) for v in line.split()]}
+            host.submit(session, msg)
+        except (ValueError, KeyError, TypeError) as e:
+            print(f"[SERVER] bad input: {e}", file=sys.stderr)
+            continue
+        await asyncio.sleep(host.batch_delay * 2)
+        print(render_board(session.board), flush=True)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Multi-session match-3 host")
+    parser.add_argument("--stdin", action="store_true", help="play one local session from stdin")
+    parser.add_argument("--address", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--size", type=int, default=8)
+    parser.add_argument("--colors", type=int, default=4)
+    parser.add_argument("--batch-delay", type=float, default=BATCH_DELAY)
+    args = parser.parse_args(argv)
+
+    host = GameHost(args.seed, args.size, args.colors, args.batch_delay)
+    try:
+        asyncio.run(serve_stdin(host) if args.stdin else serve_tcp(host, args.address, args.port))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,110 @@
+import argparse
+import csv
+import multiprocessing
+import random
+import sys
+import time
+
+from board import Board, MoveIndex
+from solver import Solver
+
+STAT_FIELDS = ["seed", "size", "colors", "solver_depth", "moves", "cascades", "tiles_cleared", "max_chain",
+               "dead_board"]
+
+
+# ==========================================
+# 1. SINGLE GAME
+# ==========================================
+def play_game(seed, size=8, num_colors=4, max_moves=500, solver_depth=0):
+    """Play one game, resolving cascades instantly.
+
+    Moves are random legal swaps, or the solver's best move when
+    solver_depth > 0.
+    """
+    rng = random.Random(seed)
+    solver = Solver(depth=solver_depth, samples=2) if solver_depth > 0 else None
+    board = Board(size, num_colors=num_colors, rng=rng)
+    board.fill()
+    index = MoveIndex(board)
+
+    moves = cascades = cleared = max_chain = 0
+    while moves < max_moves and index.has_move():
+        if solver:
+            move, _ = solver.best_move(board)
+        else:
+            move = rng.choice(sorted(index.moves))
+        board.swap(*move)
+        chain, tiles = board.resolve()
+        moves += 1
+        cascades += chain
+        cleared += tiles
+        max_chain = max(max_chain, chain)
+
+    return {
+        "seed": seed,
+        "size": size,
+        "colors": num_colors,
+        "solver_depth": solver_depth,
+        "moves": moves,
+        "cascades": cascades,
+        "tiles_cleared": cleared,
+        "max_chain": max_chain,
+        "dead_board": int(moves < max_moves),
+    }
+
+def _play_job(job):
+    return play_game(*job)
+
+# ==========================================
+# 2. BATCH RUNNER
+# ==========================================
+def run_batch(games, seed=0, size=8, num_colors=4, max_moves=500, processes=None, solver_depth=0):
+    """Yield per-game stats for `games` consecutive seeds, using a process pool."""
+    jobs = [(seed + i, size, num_colors, max_moves, solver_depth) for i in range(games)]
+    if processes == 1:
+        for job in jobs:
+            yield _play_job(job)
+        return
+    with multiprocessing.Pool(processes) as pool:
+        chunk = max(1, games // ((processes or multiprocessing.cpu_count()) * 8))
+        yield from pool.imap(_play_job, jobs, chunksize=chunk)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Headless match-3 simulation")
+    parser.add_argument("--simulate", type=int, required=True, metavar="N", help="number of games")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--size", type=int, default=8)
+    parser.add_argument("--colors", type=int, default=4)
+    parser.add_argument("--max-moves", type=int, default=500)
+    parser.add_argument("--processes", type=int, default=None)
+    parser.add_argument("--solver-depth", type=int, default=0,
+                        help="pick moves with the solver searching this deep (0: random moves)")
+    parser.add_argument("--out", default="simulation.csv", help="CSV path, or - for stdout")
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    out = sys.stdout if args.out == "-" else open(args.out, "w", newline="")
+    totals = {"moves": 0, "cascades": 0, "tiles_cleared": 0, "dead_board": 0}
+    try:
+        writer = csv.DictWriter(out, fieldnames=STAT_FIELDS)
+        writer.writeheader()
+        for stats in run_batch(args.simulate, args.seed, args.size, args.colors,
+                               args.max_moves, args.processes, args.solver_depth):
+            writer.writerow(stats)
+            for key in totals:
+                totals[key] += stats[key]
+    finally:
+        if out is not sys.stdout:
+            out.close()
+
+    elapsed = time.perf_counter() - start
+    n = max(1, args.simulate)
+    print(f"[SIM] {args.simulate} games in {elapsed:.2f}s "
+          f"({args.simulate / max(elapsed, 1e-9):.0f} games/s), "
+          f"avg moves {totals['moves'] / n:.1f}, avg cascades {totals['cascades'] / n:.1f}, "
+          f"avg cleared {totals['tiles_cleared'] / n:.1f}, dead boards {totals['dead_board']}",
+          file=sys.stderr)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
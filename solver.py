@@ -0,0 +1,179 @@
+import argparse
+import random
+import sys
+import time
+import zlib
+
+from board import Board
+
+CASCADE_BONUS = 2        # extra value per cascade after the first
+DISCOUNT = 0.9           # weight of the following move relative to this one
+
+
+# ==========================================
+# 1. EXPECTIMAX SEARCH
+# ==========================================
+class Solver:
+    """Scores swaps by searching `depth` moves ahead over sampled refills.
+
+    A move is worth the tiles its cascade clears (plus CASCADE_BONUS per
+    extra cascade) and DISCOUNT times the best move afterwards. Refills are
+    random, so every move is played out on `samples` copies of the board,
+    each refilled from an rng seeded by the crc32 of the cells, the move and
+    the sample number, and the values are averaged, so the same position
+    always gets the same score. There is no transposition table: sampled
+    refills almost never lead two branches to the same position. Boards
+    are only read, never changed.
+    """
+
+    def __init__(self, depth=2, samples=3, discount=DISCOUNT):
+        self.depth = depth
+        self.samples = samples
+        self.discount = discount
+        self.evaluations = 0
+
+    def evaluate(self, board, move, depth=None, key=None):
+        """Expected value of playing `move` on a settled board."""
+        depth = self.depth if depth is None else depth
+        key = bytes(board.cells) if key is None else key
+        r1, c1, r2, c2 = move
+        move_key = zlib.crc32(key) << 32 | r1 << 24 | c1 << 16 | r2 << 8 | c2
+        total = 0.0
+        for sample in range(self.samples):
+            child = board.copy(random.Random(move_key + sample))
+            child.swap(*move)
+            cascades, cleared = child.resolve()
+            self.evaluations += 1
+            value = cleared + CASCADE_BONUS * max(0, cascades - 1)
+            if depth > 1:
+                value += self.discount * self.value(child, depth - 1)
+            total += value
+        return total / self.samples
+
+    def value(self, board, depth):
+        """Best expected value over every legal move (0 on a dead board)."""
+        key = bytes(board.cells)
+        best = 0.0
+        for move in board.legal_moves():
+            best = max(best, self.evaluate(board, move, depth, key))
+        return best
+
+    def search(self, board, moves=None):
+        """Yield (value, move) one legal move at a time.
+
+        Lets a caller spread a search over several frames; max() of
+        everything yielded is best_move(). The board must not change
+        until the generator is exhausted.
+        """
+        key = bytes(board.cells)
+        for move in (board.legal_moves() if moves is None else moves):
+            yield self.evaluate(board, move, self.depth, key), move
+
+    def rank(self, board, moves=None):
+        """[(value, move)] for every legal move, best first."""
+        return sorted(self.search(board, moves), reverse=True)
+
+    def best_move(self, board):
+        """(move, value) of the best legal move, or (None, 0.0) on a dead board."""
+        ranked = self.rank(board)
+        if not ranked:
+            return None, 0.0
+        value, move = ranked[0]
+        return move, value
+
+# ==========================================
+# 2. PARALLEL ROOT SEARCH
+# ==========================================
+_worker = None
+
+def _init_worker(depth, samples, discount):
+    global _worker
+    _worker = Solver(depth, samples, discount)
+
+def _evaluate_job(job):
+    cells, rows, cols, num_colors, move = job
+    board = Board(rows, cols, num_colors)
+    board.cells[:] = cells
+    board.dirty_rows.clear()
+    board.dirty_cols.clear()
+    board.touched.clear()
+    return _worker.evaluate(board, move), move
+
+class ParallelSolver:
+    """Solver that spreads the root moves of each search across a process pool.
+
+    Every worker keeps its own Solver. Results match Solver exactly because
+    sampling is seeded by position, not by process. Call close() (or use
+    it as a context manager) to stop the pool.
+    """
+
+    def __init__(self, depth=2, samples=3, discount=DISCOUNT, processes=None):
+        import multiprocessing  # not needed (or loaded) by the game or the browser build
+
+        self.depth = depth
+        self.pool = multiprocessing.Pool(processes, _init_worker, (depth, samples, discount))
+
+    def rank(self, board, moves=None):
+        moves = board.legal_moves() if moves is None else moves
+        jobs = [(bytes(board.cells), board.rows, board.cols, board.num_colors, move) for move in moves]
+        return sorted(self.pool.imap_unordered(_evaluate_job, jobs), reverse=True)
+
+    def best_move(self, board):
+        ranked = self.rank(board)
+        if not ranked:
+            return None, 0.0
+        value, move = ranked[0]
+        return move, value
+
+    def close(self):
+        self.pool.terminate()
+        self.pool.join()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+# ==========================================
+# 3. COMMAND LINE BENCHMARK
+# ==========================================
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Search the best move on random boards")
+    parser.add_argument("--positions", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--size", type=int, default=8)
+    parser.add_argument("--colors", type=int, default=4)
+    parser.add_argument("--depth", type=int, default=2)
+    parser.add_argument("--samples", type=int, default=3)
+    parser.add_argument("--processes", type=int, default=1, help="0 for one per core")
+    args = parser.parse_args(argv)
+
+    if args.processes == 1:
+        solver = Solver(args.depth, args.samples)
+    else:
+        solver = ParallelSolver(args.depth, args.samples, processes=args.processes or None)
+    rng = random.Random(args.seed)
+    total_value = 0.0
+    start = time.perf_counter()
+    try:
+        for _ in range(args.positions):
+            board = Board(args.size, num_colors=args.colors, rng=rng)
+            board.fill()
+            move, value = solver.best_move(board)
+            total_value += value
+    finally:
+        if isinstance(solver, ParallelSolver):
+            solver.close()
+    elapsed = time.perf_counter() - start
+
+    n = max(1, args.positions)
+    line = (f"[SOLVER] {args.positions} positions at depth {args.depth} in {elapsed:.2f}s "
+            f"({elapsed / n * 1000:.1f} ms/position), avg best value {total_value / n:.2f}")
+    if isinstance(solver, Solver):
+        line += f", {solver.evaluations / max(elapsed, 1e-9):.0f} evaluations/s"
+    print(line, file=sys.stderr)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,28 @@
+import json
+import struct
+
+from assets import BUNDLE_MAGIC, Bundle
+
+
+def write_bundle(path, header, payload=b""):
+    raw = json.dumps(header).encode()
+    path.write_bytes(BUNDLE_MAGIC + struct.pack("<I", len(raw)) + raw + payload)
+
+
+def test_unusable_bundles_open_as_none(tmp_path):
+    path = tmp_path / "bundle.bin"
+    assert Bundle.open(str(path)) is None
+    for data in (b"", BUNDLE_MAGIC, BUNDLE_MAGIC + b"\1\0", BUNDLE_MAGIC + struct.pack("<I", 9) + b"{\"images"):
+        path.write_bytes(data)
+        assert Bundle.open(str(path)) is None, data
+
+
+def test_images_at_a_stale_size_are_not_used(tmp_path):
+    path = tmp_path / "bundle.bin"
+    write_bundle(path, {"images": {"crowd": {"size": [1200, 300], "offset": 0, "length": 0}}, "sounds": {}})
+    bundle = Bundle.open(str(path))
+    assert bundle.has_image("crowd", size=(1200, 300))
+    assert bundle.has_image("crowd", width=1200)
+    assert not bundle.has_image("crowd", size=(1200, 320))
+    assert not bundle.has_image("crowd", width=1000)
+    assert not bundle.has_image("charli")
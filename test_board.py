@@ -0,0 +1,83 @@
+import random
+
+from board import EMPTY, Board, MoveIndex
+
+
+# ==========================================
+# 1. BRUTE-FORCE REFERENCES
+# ==========================================
+def brute_matches(board):
+    """Every cell in a horizontal or vertical run of three equal non-empty cells."""
+    rows, cols, get = board.rows, board.cols, board.get
+    matched = set()
+    for r in range(rows):
+        for c in range(cols):
+            v = get(r, c)
+            if v == EMPTY:
+                continue
+            if c + 2 < cols and get(r, c + 1) == v and get(r, c + 2) == v:
+                matched.update(((r, c), (r, c + 1), (r, c + 2)))
+            if r + 2 < rows and get(r + 1, c) == v and get(r + 2, c) == v:
+                matched.update(((r, c), (r + 1, c), (r + 2, c)))
+    return matched
+
+def brute_legal_moves(board):
+    """Swaps of two different non-empty neighbours that put one of them in a run."""
+    moves = set()
+    for r in range(board.rows):
+        for c in range(board.cols):
+            for r2, c2 in ((r, c + 1), (r + 1, c)):
+                if r2 >= board.rows or c2 >= board.cols:
+                    continue
+                a, b = board.get(r, c), board.get(r2, c2)
+                if a == b or EMPTY in (a, b):
+                    continue
+                trial = board.copy()
+                trial.swap(r, c, r2, c2)
+                if {(r, c), (r2, c2)} & brute_matches(trial):
+                    moves.add((r, c, r2, c2))
+    return moves
+
+def random_board(rng, rows, cols, num_colors, holes):
+    board = Board(rows, cols, num_colors, rng)
+    board.randomize()
+    board.clear([(r, c) for r in range(rows) for c in range(cols) if rng.random() < holes])
+    return board
+
+# ==========================================
+# 2. COMPARISONS
+# ==========================================
+def test_full_scans_match_brute_force():
+    rng = random.Random(1)
+    for _ in range(300):
+        rows, cols = rng.randint(1, 9), rng.randint(1, 9)
+        board = random_board(rng, rows, cols, rng.randint(2, 6), rng.choice((0.0, 0.1, 0.3)))
+        expected = brute_matches(board)
+        assert set(board.find_all_matches()) == expected
+        assert set(board.find_matches()) == expected
+        assert set(board.legal_moves()) == brute_legal_moves(board)
+        assert board.has_legal_move() == bool(brute_legal_moves(board))
+
+def test_incremental_state_matches_brute_force():
+    """Dirty-line scans and MoveIndex stay equal to full recomputation through play."""
+    rng = random.Random(2)
+    for _ in range(40):
+        size = rng.randint(4, 9)
+        board = random_board(rng, size, size, rng.randint(3, 6), 0.1)
+        index = MoveIndex(board)
+        for _ in range(30):
+            assert set(board.find_matches()) == brute_matches(board)
+            index.refresh()
+            assert index.moves == brute_legal_moves(board)
+            step = rng.random()
+            if step < 0.4:
+                r, c = rng.randrange(size), rng.randrange(size - 1)
+                board.swap(r, c, r, c + 1)
+            elif step < 0.6:
+                r, c = rng.randrange(size - 1), rng.randrange(size)
+                board.swap(r, c, r + 1, c)
+            elif step < 0.8:
+                board.clear({(rng.randrange(size), rng.randrange(size)) for _ in range(rng.randint(1, 4))})
+            else:
+                board.resolve()
+                assert not brute_matches(board)
@@ -0,0 +1,40 @@
+import os
+import random
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import pygame
+
+from assets import AssetManager, Bundle, image_specs
+from main import BOARD_X, BOARD_Y, BRAT_GREEN, BUNDLE_PATH, SCREEN_HEIGHT, SCREEN_WIDTH, TILE_SIZE, Game
+from quality import TIERS, tier_index
+from render import Compositor
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+
+def test_partial_repaints_match_full_repaints(monkeypatch):
+    """Every partially presented frame equals a full replay of the same display list."""
+    monkeypatch.chdir(HERE)
+    pygame.init()
+    screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
+    assets = AssetManager(Bundle.open(BUNDLE_PATH))
+    for name, spec in image_specs(SCREEN_WIDTH, TILE_SIZE).items():
+        assets.image(name, **spec)
+    game = Game(assets.wait(), rng=random.Random(3), quality=TIERS[tier_index("kiosk")])
+    comp = Compositor(screen, BRAT_GREEN)
+    partial = 0
+    for frame in range(300):
+        game.update()
+        if frame % 37 == 5:
+            game.handle_event(pygame.event.Event(pygame.MOUSEBUTTONDOWN, pos=(BOARD_X + 10, BOARD_Y + 10)))
+        game.draw(comp)
+        if comp.present() == [comp.screen_rect]:
+            continue
+        partial += 1
+        presented = pygame.image.tobytes(screen, "RGB")
+        comp._replay()
+        assert pygame.image.tobytes(screen, "RGB") == presented, f"frame {frame}"
+    assert partial > 200
+    pygame.quit()
@@ -0,0 +1,49 @@
+import asyncio
+import random
+
+import pytest
+
+from server import GameHost
+
+
+def test_snapshot_plus_diffs_mirror_the_server_board():
+    """A client that applies every diff to its snapshot ends up with the server's cells."""
+    async def play():
+        host = GameHost(seed=7)
+        sent = []
+        session = host.join("guest", sent.append)
+        mirror = list(sent[0]["cells"])
+        rng = random.Random(1)
+        acks = []
+        for seq in range(1, 61):
+            move = rng.choice(session.board.legal_moves())
+            if seq % 7 == 0:
+                move = (0, 0, 0, 1) if move != (0, 0, 0, 1) else (0, 0, 1, 0)
+            host.submit(session, {"t": "swap", "seq": seq, "m": list(move)})
+            if seq % 3 == 0:
+                host.submit(session, {"t": "swap", "seq": seq - 2, "m": list(move)})
+                await asyncio.sleep(host.batch_delay * 2)
+                for msg in sent:
+                    if msg["t"] == "diff":
+                        for i, cell in msg["cells"]:
+                            mirror[i] = cell
+                        acks.append(msg["ack"])
+                sent.clear()
+        return session, mirror, acks
+
+    session, mirror, acks = asyncio.run(play())
+    assert session.moves > 20
+    assert mirror == list(session.board.cells)
+    assert acks == sorted(acks) and acks[-1] == 60
+
+
+@pytest.mark.parametrize("seq", [None, "3", 2.0, True])
+def test_swaps_need_an_integer_seq(seq):
+    host = GameHost()
+    session = host.join("guest", lambda msg: None)
+    msg = {"t": "swap", "m": [0, 0, 0, 1]}
+    if seq is not None:
+        msg["seq"] = seq
+    with pytest.raises(TypeError):
+        host.submit(session, msg)
+    assert not session.pending